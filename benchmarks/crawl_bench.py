@@ -0,0 +1,205 @@
+"""Offline crawl benchmark against the local musicatm stand-in (benchmarks/fake_site.py)
+
+For every dataset size a fake site is started in its own process, then each scenario
+runs in a fresh interpreter (so peak RSS is per scenario) with Config.BASE_URL pointed
+at the fake site. Reported per run: wall time, pages/s (every fetched page), songs/s,
+p50/p99 fetch latency (fetch_page_status calls, retries included) and peak RSS.
+ok is False when the crawl failed (e.g. a full crawl that lost pages to injected
+errors is not installed) and failed counts listing pages and songs not fetched.
+
+    python -m benchmarks.crawl_bench --sizes 400,2000,8000 --latency 0.05 --error-rate 0.01
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List
+
+SCENARIOS = ("get_songs_list", "update_cache", "update_cache_incremental")
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+async def run_case(scenario: str, port: int, pages: int, parser_workers: int) -> dict:
+    from core.config import Config
+    Config.BASE_URL = f"http://127.0.0.1:{port}"
+    Config.LISTING_PAGES = pages
+    Config.PARSER_WORKERS = parser_workers
+    # Everything the service persists goes to a scratch dir, so runs neither reuse nor grow ./data
+    data_dir = tempfile.mkdtemp(prefix="toc-bench-")
+    Config.SNAPSHOT_PATH = os.path.join(data_dir, "songs.snapshot")
+    Config.CHORD_CACHE_PATH = os.path.join(data_dir, "chords.json")
+    Config.CRAWL_JOURNAL_PATH = os.path.join(data_dir, "crawl.journal")
+    # Measure fetches from the site: the incremental run would otherwise read the full crawl's pages from disk
+    Config.HTTP_CACHE_DIR = None
+    from modules.songs.service import AsyncSongService
+    from modules.songs.metrics import CrawlProgress
+
+    service = AsyncSongService()
+    latencies: List[float] = []
+    fetch_page_status = service.fetch_page_status
+
+    async def timed_fetch(url: str, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await fetch_page_status(url, *args, **kwargs)
+        finally:
+            latencies.append(time.perf_counter() - started)
+
+    service.fetch_page_status = timed_fetch
+
+    ok = True
+    async with service:
+        if scenario == "update_cache_incremental":
+            # Fill the cache first; only the follow-up incremental crawl is measured
+            try:
+                await service.update_cache(full=True)
+            except Exception:
+                ok = False
+            latencies.clear()
+
+        started = time.perf_counter()
+        if scenario == "get_songs_list":
+            progress = CrawlProgress("bench", pages)
+            songs = len(await service.crawl_pages(pages, progress=progress))
+        else:
+            try:
+                await service.update_cache(full=scenario == "update_cache")
+            except Exception:
+                # With injected errors a crawl may refuse to install; it is reported, not fatal
+                ok = False
+            progress = service._progress
+            songs = progress.songs_done
+        elapsed = time.perf_counter() - started
+        cached = len(service.get_songs())
+
+    return {
+        "scenario": scenario,
+        "seconds": round(elapsed, 3),
+        "fetches": len(latencies),
+        "songs": songs,
+        "cached": cached,
+        "ok": ok,
+        "failed": progress.pages_failed + progress.songs_failed,
+        "pages_per_s": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "songs_per_s": round(songs / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port: int, timeout: float = 10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"fake site did not start on port {port}")
+
+
+def start_site(args: argparse.Namespace, size: int, port: int) -> subprocess.Popen:
+    command = [
+        sys.executable, "-m", "benchmarks.fake_site",
+        "--port", str(port), "--songs", str(size),
+        "--latency", str(args.latency), "--error-rate", str(args.error_rate),
+        "--slow-rate", str(args.slow_rate), "--slow-seconds", str(args.slow_seconds),
+        "--capacity", str(args.capacity), "--seed", str(args.seed),
+    ]
+    process = subprocess.Popen(command)
+    try:
+        wait_for_port(port)
+    except RuntimeError:
+        process.kill()
+        raise
+    return process
+
+
+def run_scenario(args: argparse.Namespace, scenario: str, port: int, pages: int) -> dict:
+    command = [
+        sys.executable, "-m", "benchmarks.crawl_bench", "--case", scenario,
+        "--port", str(port), "--pages", str(pages), "--parser-workers", str(args.parser_workers),
+    ]
+    output = subprocess.run(command, check=True, stdout=subprocess.PIPE, text=True).stdout
+    # Crawl progress is printed too; the result is the last line
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def print_table(rows: List[dict]):
+    columns = ("size", "scenario", "ok", "failed", "seconds", "fetches", "songs", "pages_per_s", "songs_per_s", "p50_ms", "p99_ms", "peak_rss_mb")
+    widths = [max(len(column), *(len(str(row[column])) for row in rows)) for column in columns]
+    print("  ".join(column.ljust(width) for column, width in zip(columns, widths)))
+    for row in rows:
+        print("  ".join(str(row[column]).ljust(width) for column, width in zip(columns, widths)))
+
+
+def main():
+    from benchmarks.fake_site import PER_PAGE
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="400,2000,8000", help="comma separated catalogue sizes (songs)")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help=f"comma separated subset of {SCENARIOS}")
+    parser.add_argument("--latency", type=float, default=0.02, help="mean fake site latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of 5xx responses")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="fraction of bodies streamed slowly")
+    parser.add_argument("--slow-seconds", type=float, default=1.0, help="time to stream a slow body")
+    parser.add_argument("--capacity", type=int, default=0, help="fake site in-flight cap before 429 (0 = unlimited)")
+    parser.add_argument("--parser-workers", type=int, default=2, help="Config.PARSER_WORKERS for the crawler")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", action="store_true", help="print results as JSON lines instead of a table")
+    # Internal: run one scenario in this process and print its result
+    parser.add_argument("--case", choices=SCENARIOS, help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--pages", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        result = asyncio.run(run_case(args.case, args.port, args.pages, args.parser_workers))
+        print(json.dumps(result))
+        return
+
+    rows = []
+    for size in (int(value) for value in args.sizes.split(",")):
+        port = free_port()
+        site = start_site(args, size, port)
+        try:
+            for scenario in args.scenarios.split(","):
+                row = {"size": size, **run_scenario(args, scenario, port, -(-size // PER_PAGE))}
+                rows.append(row)
+                if args.json:
+                    print(json.dumps(row), flush=True)
+        finally:
+            site.terminate()
+            site.wait()
+
+    if not args.json:
+        print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
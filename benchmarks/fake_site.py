@@ -0,0 +1,229 @@
+"""Local stand-in for musicatm.com serving synthetic listing, song and chord pages
+
+The markup follows what core/patterns.py expects from the real site, padded with
+navigation, sidebars and comments so pages have realistic sizes. Every page carries
+an ETag and answers a matching If-None-Match with 304. Latency, errors, slow bodies
+and a concurrency cap (answered with 429 + Retry-After) can be injected.
+
+    python -m benchmarks.fake_site --songs 2000 --latency 0.05 --error-rate 0.01
+"""
+import argparse
+import asyncio
+import hashlib
+import random
+from aiohttp import web
+
+PER_PAGE = 40
+THAI_SYLLABLES = [
+    "รัก", "เธอ", "ฉัน", "ใจ", "คิด", "ถึง", "ไม่", "เคย", "ลืม", "ฟ้า", "ดาว", "คืน", "วัน",
+    "น้ำ", "ตา", "ยิ้ม", "หัว", "ทาง", "เดิน", "ฝน", "ลม", "หนาว", "เหงา", "ฝัน", "ไกล", "ใกล้",
+]
+
+
+def _words(rng: random.Random, count: int) -> str:
+    return "".join(rng.choice(THAI_SYLLABLES) for _ in range(count))
+
+
+def _padding(rng: random.Random, blocks: int) -> str:
+    # Navigation / sidebar / comment noise around the fields the parser needs
+    return "".join(
+        f'<li class="nav-item"><a href="/lyric/tag/{rng.randint(1, 9999)}">{_words(rng, 3)}</a></li>\n'
+        for _ in range(blocks)
+    )
+
+
+class SiteData:
+    """Deterministic synthetic catalogue of songs, newest first"""
+
+    def __init__(self, songs: int, seed: int = 1):
+        self.size = songs
+        self.seed = seed
+
+    def pages(self) -> int:
+        return max(1, -(-self.size // PER_PAGE))
+
+    def song_ref(self, song_id: int):
+        rng = random.Random(self.seed * 1_000_003 + song_id)
+        title = _words(rng, rng.randint(2, 4))
+        singer = f"{_words(rng, 2)} {rng.randint(1, max(2, self.size // 10))}"
+        return f"/lyric/{song_id}-{title}", title, singer
+
+    def listing_page(self, page: int) -> str:
+        rng = random.Random(self.seed + page)
+        start = (page - 1) * PER_PAGE
+        ids = range(start, min(start + PER_PAGE, self.size))
+        items = "".join(
+            f'<a href="{href}" class="list-group-item">\n<h3>{title} - {singer}</h3>\n'
+            f'<small>{_words(rng, 2)}</small></a>\n'
+            for href, title, singer in (self.song_ref(i) for i in ids)
+        )
+        hits = "".join(
+            f'<a href="{href}" class="list-group-item"><h3>{title} - {singer}</h3></a>\n'
+            for href, title, singer in (self.song_ref(i) for i in range(min(10, self.size)))
+        )
+        return (
+            '<!DOCTYPE html><html lang="th"><head><meta charset="utf-8"><title>เนื้อเพลง</title></head><body>\n'
+            f'<nav><ul>{_padding(rng, 60)}</ul></nav>\n'
+            '<div class="panel panel-default"><div class="panel-heading">'
+            '<h2 class="panel-title">เนื้อเพลงฮิตเพิ่มล่าสุด</h2></div>\n'
+            f'<div class="list-group main_list">\n{items}'
+            '<div class="panel panel-info" id="comment_lyric_list">\n'
+            f'<ul>{_padding(rng, 20)}</ul>\n'
+            '<div class="list-group right_suggestion_list" id="hitsong_list">\n'
+            f'{hits}</div>\n</div>\n</div></div>\n'
+            f'<footer><ul>{_padding(rng, 30)}</ul></footer></body></html>'
+        )
+
+    def song_page(self, song_id: int) -> str:
+        rng = random.Random(self.seed * 7_919 + song_id)
+        href, title, singer = self.song_ref(song_id)
+        lines = "<br />\n".join(
+            f'<span class="chord">{rng.choice("CDEFGAB")}</span>&nbsp;{_words(rng, rng.randint(4, 9))}'
+            for _ in range(rng.randint(20, 45))
+        )
+        return (
+            '<!DOCTYPE html><html lang="th"><head><meta charset="utf-8">'
+            f'<title>{title} - {singer}</title></head><body>\n'
+            f'<nav><ul>{_padding(rng, 60)}</ul></nav>\n'
+            f'<div class="post-header"><img alt="{singer}" src="/uploads/avatar/{song_id % 97}.jpg" class="postpic">\n'
+            f'<h1>{title}</h1><span class="views">ดู {rng.randint(1, 999_999)} ครั้ง</span></div>\n'
+            '<div class="lyric-content" id="lyric">\n<div class="lyric-tools"></div>\n'
+            f'<pre class="lyric-text">{lines}</pre>\n</div>\n'
+            f'<a class="btn btn-block btn-success" href="/chord/{song_id}">ดูคอร์ดเพลง</a>\n'
+            f'<div id="comments"><ul>{_padding(rng, 80)}</ul></div>\n'
+            f'<footer><ul>{_padding(rng, 30)}</ul></footer></body></html>'
+        )
+
+    def chord_page(self, song_id: int) -> str:
+        rng = random.Random(self.seed * 104_729 + song_id)
+        return (
+            '<!DOCTYPE html><html lang="th"><head><meta charset="utf-8"></head><body>\n'
+            f'<nav><ul>{_padding(rng, 60)}</ul></nav>\n'
+            '<div class="chord-guitar-img">\n<p class="text-center">\n'
+            f'<img class="img-responsive" src="/uploads/chords/{song_id}.png" alt="chord"></p></div>\n'
+            f'<footer><ul>{_padding(rng, 30)}</ul></footer></body></html>'
+        )
+
+
+class FakeMusicSite:
+    """aiohttp application serving SiteData with configurable misbehaviour"""
+
+    def __init__(
+        self,
+        data: SiteData,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        slow_rate: float = 0.0,
+        slow_seconds: float = 1.0,
+        capacity: int = 0,
+        retry_after: int = 1,
+        seed: int = 1
+    ):
+        self.data = data
+        self.latency = latency
+        self.error_rate = error_rate
+        self.slow_rate = slow_rate
+        self.slow_seconds = slow_seconds
+        self.capacity = capacity
+        self.retry_after = retry_after
+        self.rng = random.Random(seed)
+        self.in_flight = 0
+        self.hits = {"listing": 0, "song": 0, "chord": 0, "error": 0, "throttled": 0, "not_modified": 0}
+
+    async def _serve(self, request: web.Request, kind: str, body: str) -> web.StreamResponse:
+        self.hits[kind] += 1
+        if self.capacity and self.in_flight >= self.capacity:
+            self.hits["throttled"] += 1
+            return web.Response(status=429, headers={"Retry-After": str(self.retry_after)})
+
+        self.in_flight += 1
+        try:
+            if self.latency:
+                # Jittered latency that grows as the server gets busier
+                load = 1 + (self.in_flight / self.capacity if self.capacity else 0)
+                await asyncio.sleep(self.rng.uniform(0.5, 1.5) * self.latency * load)
+            if self.rng.random() < self.error_rate:
+                self.hits["error"] += 1
+                return web.Response(status=self.rng.choice((500, 502, 503)))
+
+            payload = body.encode("utf-8")
+            etag = f'"{hashlib.blake2b(payload, digest_size=8).hexdigest()}"'
+            if request.headers.get("If-None-Match") == etag:
+                self.hits["not_modified"] += 1
+                return web.Response(status=304, headers={"ETag": etag})
+            if self.rng.random() >= self.slow_rate:
+                return web.Response(body=payload, content_type="text/html", charset="utf-8", headers={"ETag": etag})
+
+            # Slow body: dribble the page out over slow_seconds
+            response = web.StreamResponse(headers={"Content-Type": "text/html; charset=utf-8", "ETag": etag})
+            response.content_length = len(payload)
+            await response.prepare(request)
+            chunks = 8
+            step = -(-len(payload) // chunks)
+            try:
+                for i in range(0, len(payload), step):
+                    await response.write(payload[i:i + step])
+                    await asyncio.sleep(self.slow_seconds / chunks)
+                await response.write_eof()
+            except ConnectionResetError:
+                # Streaming clients hang up once they have read what they need
+                pass
+            return response
+        finally:
+            self.in_flight -= 1
+
+    async def listing(self, request: web.Request) -> web.StreamResponse:
+        page = int(request.match_info["page"])
+        if page > self.data.pages():
+            return web.Response(text="<html><body>no songs</body></html>", content_type="text/html")
+        return await self._serve(request, "listing", self.data.listing_page(page))
+
+    async def song(self, request: web.Request) -> web.StreamResponse:
+        song_id = int(request.match_info["song_id"])
+        if song_id >= self.data.size:
+            return web.Response(status=404)
+        return await self._serve(request, "song", self.data.song_page(song_id))
+
+    async def chord(self, request: web.Request) -> web.StreamResponse:
+        song_id = int(request.match_info["song_id"])
+        if song_id >= self.data.size:
+            return web.Response(status=404)
+        return await self._serve(request, "chord", self.data.chord_page(song_id))
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/lyric/page{page:\\d+}", self.listing)
+        app.router.add_get("/lyric/{song_id:\\d+}-{slug}", self.song)
+        app.router.add_get("/chord/{song_id:\\d+}", self.chord)
+        return app
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--songs", type=int, default=2000, help="catalogue size")
+    parser.add_argument("--latency", type=float, default=0.0, help="mean response latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of 5xx responses")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="fraction of bodies streamed slowly")
+    parser.add_argument("--slow-seconds", type=float, default=1.0, help="time to stream a slow body")
+    parser.add_argument("--capacity", type=int, default=0, help="in-flight requests before answering 429 (0 = unlimited)")
+    parser.add_argument("--seed", type=int, default=1)
+    return parser
+
+
+def site_from_args(args: argparse.Namespace) -> FakeMusicSite:
+    return FakeMusicSite(
+        SiteData(args.songs, args.seed),
+        latency=args.latency,
+        error_rate=args.error_rate,
+        slow_rate=args.slow_rate,
+        slow_seconds=args.slow_seconds,
+        capacity=args.capacity,
+        seed=args.seed
+    )
+
+
+if __name__ == "__main__":
+    arguments = build_parser().parse_args()
+    web.run_app(site_from_args(arguments).app(), host=arguments.host, port=arguments.port, print=None)
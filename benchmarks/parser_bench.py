@@ -0,0 +1,129 @@
+"""Microbenchmark: single-scan core.parser against the per-field core.patterns regexes
+
+Runs both parsers over the saved pages in benchmarks/fixtures, checks they return the
+same result and prints the time per page for each.
+
+    python -m benchmarks.parser_bench --number 2000
+"""
+import argparse
+import pathlib
+import timeit
+from core import parser
+from core.patterns import (
+    LYRICS_PATTERN, BR_PATTERN, NBSP_PATTERN, TAG_PATTERN,
+    CHORD_BUTTON_PATTERN, CHORD_IMG_PATTERN, SECTION_PATTERN,
+    COMMENT_SPLIT_PATTERN, A_TAG_PATTERN, HREF_PATTERN,
+    H3_PATTERN, H3_HEADER_PATTERN, WHITESPACE_PATTERN,
+    HITSONG_SECTION_PATTERN, VIEW_PATTERN, AVATAR_PATTERN
+)
+
+FIXTURES = pathlib.Path(__file__).parent / "fixtures"
+BASE_URL = "https://www.musicatm.com"
+
+
+# Regex baseline: one pattern per field, as the crawler parsed pages before core.parser
+
+def regex_parse_listing(html: str, popular: bool = False):
+    section_match = SECTION_PATTERN.search(html)
+    if not section_match:
+        return []
+
+    section_html = section_match.group(1)
+    if popular:
+        parts = COMMENT_SPLIT_PATTERN.split(section_html, maxsplit=1)
+        if len(parts) < 2:
+            return []
+        hit_section_match = HITSONG_SECTION_PATTERN.search(parts[1])
+        if not hit_section_match:
+            return []
+        a_tags = A_TAG_PATTERN.findall(hit_section_match.group(1))
+    else:
+        a_tags = A_TAG_PATTERN.findall(COMMENT_SPLIT_PATTERN.split(section_html, maxsplit=1)[0])
+
+    songs = []
+    for a_tag in a_tags:
+        href_match = HREF_PATTERN.search(a_tag)
+        href = href_match.group(1) if href_match else ''
+
+        h3_match = H3_PATTERN.search(a_tag) or H3_HEADER_PATTERN.search(a_tag)
+        if h3_match:
+            h3_text = WHITESPACE_PATTERN.sub(' ', h3_match.group(1)).strip()
+            if ' - ' in h3_text:
+                song_name, singer_name = h3_text.split(' - ', 1)
+            else:
+                song_name, singer_name = h3_text, ''
+            songs.append((href, song_name.strip(), singer_name.strip()))
+    return songs
+
+
+def regex_parse_views(html: str) -> int:
+    view_match = VIEW_PATTERN.search(html)
+    if view_match:
+        try:
+            return int(view_match.group(1))
+        except (ValueError, TypeError):
+            return 0
+    return 0
+
+
+def regex_parse_song_page(html: str, base_url: str):
+    views = regex_parse_views(html)
+
+    song_transcriber = ""
+    song_transcriber_match = AVATAR_PATTERN.search(html)
+    if song_transcriber_match:
+        song_transcriber = base_url + song_transcriber_match.group(1)
+
+    lyrics_match = LYRICS_PATTERN.search(html)
+    lyrics = ""
+    if lyrics_match:
+        lyrics = lyrics_match.group(1)
+        lyrics = BR_PATTERN.sub('\n', lyrics)
+        lyrics = NBSP_PATTERN.sub(' ', lyrics)
+        lyrics = TAG_PATTERN.sub('', lyrics).strip()
+
+    chord_url = ""
+    chord_match = CHORD_BUTTON_PATTERN.search(html)
+    if chord_match:
+        chord_url = base_url + chord_match.group(1)
+
+    return lyrics, views, chord_url, song_transcriber
+
+
+def regex_parse_chord_page(html: str, base_url: str) -> str:
+    img_match = CHORD_IMG_PATTERN.search(html)
+    if img_match:
+        return base_url + img_match.group(1)
+    return ""
+
+
+def cases():
+    """(label, regex call, single-scan call) for every fixture"""
+    for path in sorted(FIXTURES.glob("*.html")):
+        html = path.read_text(encoding="utf-8")
+        if path.name.startswith("listing"):
+            yield f"{path.name} (latest)", lambda h=html: regex_parse_listing(h), lambda h=html: parser.parse_listing(h)
+            yield f"{path.name} (popular)", lambda h=html: regex_parse_listing(h, True), lambda h=html: parser.parse_listing(h, True)
+        elif path.name.startswith("song"):
+            yield path.name, lambda h=html: regex_parse_song_page(h, BASE_URL), lambda h=html: parser.parse_song_page(h, BASE_URL)
+        elif path.name.startswith("chord"):
+            yield path.name, lambda h=html: regex_parse_chord_page(h, BASE_URL), lambda h=html: parser.parse_chord_page(h, BASE_URL)
+
+
+def main():
+    arguments = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arguments.add_argument("--number", type=int, default=2000, help="parses per timing run")
+    arguments.add_argument("--repeat", type=int, default=5, help="timing runs (the best one is reported)")
+    args = arguments.parse_args()
+
+    print(f"{'fixture':<28} {'regex us':>10} {'scan us':>10} {'speedup':>8}")
+    for label, regex_call, scan_call in cases():
+        if regex_call() != scan_call():
+            raise SystemExit(f"{label}: parsers disagree\n regex: {regex_call()!r}\n scan:  {scan_call()!r}")
+        regex_time = min(timeit.repeat(regex_call, number=args.number, repeat=args.repeat)) / args.number
+        scan_time = min(timeit.repeat(scan_call, number=args.number, repeat=args.repeat)) / args.number
+        print(f"{label:<28} {regex_time * 1e6:>10.1f} {scan_time * 1e6:>10.1f} {regex_time / scan_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,11 +5,13 @@ from .patterns import (
     COMMENT_SPLIT_PATTERN, A_TAG_PATTERN, HREF_PATTERN,
     H3_PATTERN, H3_HEADER_PATTERN, WHITESPACE_PATTERN
 )
+from .parser import parse_listing, parse_views, parse_song_page, parse_chord_page, clean_lyrics
 
 __all__ = [
     "Config",
     "LYRICS_PATTERN", "BR_PATTERN", "NBSP_PATTERN", "TAG_PATTERN",
     "CHORD_BUTTON_PATTERN", "CHORD_IMG_PATTERN", "SECTION_PATTERN",
     "COMMENT_SPLIT_PATTERN", "A_TAG_PATTERN", "HREF_PATTERN",
-    "H3_PATTERN", "H3_HEADER_PATTERN", "WHITESPACE_PATTERN"
+    "H3_PATTERN", "H3_HEADER_PATTERN", "WHITESPACE_PATTERN",
+    "parse_listing", "parse_views", "parse_song_page", "parse_chord_page", "clean_lyrics"
 ]
\ No newline at end of file
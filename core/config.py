@@ -10,4 +10,87 @@ class Config:
     SONG_PROCESSING_TIMEOUT = 60
     
     # HTTP Configuration
-    USER_AGENT = "Mozilla/5.0 (compatible; MusicScraper/1.0)"
\ No newline at end of file
+    USER_AGENT = "Mozilla/5.0 (compatible; MusicScraper/1.0)"
+    HTTP_MAX_CONNECTIONS = 100  # connection pool size across all hosts
+    STREAM_SONG_PAGES = True  # stop reading song pages once the parsed fields are in (closes the connection)
+    STREAM_CHUNK_SIZE = 4096  # bytes per read when streaming a page
+    
+    # HTTP Cache Configuration (page bodies on disk, revalidated with ETag / Last-Modified)
+    HTTP_CACHE_DIR = "data/http_cache"  # set to None to disable
+    HTTP_CACHE_MAX_BYTES = 512 * 1024 * 1024  # LRU bound on cached bodies and parse results
+    HTTP_CACHE_TTL = {  # seconds a cached page is used without revalidating; kinds not listed are not cached
+        "listing": 60,  # new songs appear at the top
+        "song": 60 * 60,  # shorter than VIEW_REFRESH_INTERVAL, so view refreshes still reach the site
+        "chord": 30 * 24 * 60 * 60,  # chord pages practically never change
+    }
+    
+    # Adaptive Concurrency Configuration (per host, AIMD)
+    LIMITER_INITIAL = 10  # in-flight requests allowed before any feedback
+    LIMITER_MIN = 1
+    LIMITER_MAX = 64
+    LIMITER_DECREASE = 0.5  # multiplier applied on timeouts, 429 and 5xx
+    LIMITER_LATENCY_TOLERANCE = 2.0  # back off when recent latency exceeds this x the average
+    
+    # Retry Policy Configuration (shared by every fetch)
+    RETRY_BUDGET = 0.1  # retries allowed per crawl, as a fraction of its requests
+    RETRY_MIN_PER_CRAWL = 10  # retries allowed on top of the budget, so a crawl can start
+    RETRY_BASE_DELAY = 0.5  # seconds; backoff cap doubles per retry, wait is uniform up to it
+    RETRY_MAX_DELAY = 10
+    BREAKER_ERROR_RATE = 0.5  # open the circuit when more than this fraction of recent requests failed
+    BREAKER_WINDOW = 50  # recent requests the error rate is measured over
+    BREAKER_MIN_REQUESTS = 20  # requests needed in the window before the circuit can open
+    BREAKER_COOLDOWN = 30  # seconds the circuit stays open before a probe request
+    
+    # Crawl Configuration
+    LISTING_PAGES = 253  # listing pages walked by a full crawl
+    INCREMENTAL_KNOWN_RUN = 30  # consecutive known songs that end an incremental crawl
+    VIEW_REFRESH_INTERVAL = 6 * 60 * 60  # seconds between view-count refreshes
+    DISCOVERY_INTERVAL = 15 * 60  # seconds between new-song discovery crawls
+    DISCOVERY_PAGES = 10  # listing pages a discovery crawl may walk (newest first)
+    FULL_CRAWL_INTERVAL = 7 * 24 * 60 * 60  # seconds between full recrawls (0 disables a cadence)
+    CRAWL_JITTER = 0.1  # each interval is shifted by up to +/- this fraction of itself
+    CRAWL_RETRY_INTERVAL = 15 * 60  # seconds before retrying a scheduled crawl that failed
+    CRAWL_QUIET_HOURS = None  # (start, end) local hours with no scheduled crawls, e.g. (18, 23), (22, 24) or (23, 6)
+    SCHEDULER_ENABLED = True  # run scheduled crawls; manual triggers work either way
+    CRAWL_LISTING_WORKERS = 10  # concurrent listing page fetches
+    CRAWL_SONG_WORKERS = 50  # concurrent song page fetches
+    CRAWL_CHORD_WORKERS = 50  # concurrent chord page fetches (eager chord mode)
+    CRAWL_QUEUE_SIZE = 500  # max items waiting between two pipeline stages
+    CRAWL_MIN_KEEP_RATIO = 0.5  # a full crawl finding fewer songs than this fraction of the cache is not installed
+    CRAWL_JOURNAL_PATH = "data/crawl.journal"  # full crawl progress log for resuming (None = off)
+    CRAWL_JOURNAL_MAX_AGE = 24 * 60 * 60  # seconds after which an unfinished journal is started over
+    CRAWL_JOURNAL_MAX_RESUMES = 3  # after this many resumes a full crawl is installed despite failed pages
+    
+    # Chord Image Configuration
+    CHORD_MODE = "background"  # eager: during the crawl, lazy: when served, background: low-priority queue after crawls
+    CHORD_CACHE_SIZE = 100_000  # chord page URL -> image URL entries kept (LRU)
+    CHORD_CACHE_PATH = "data/chords.json"  # set to None to keep the memo in memory only
+    CHORD_BACKGROUND_WORKERS = 2  # concurrent chord page fetches in background mode
+    CHORD_LAZY_TIMEOUT = 5  # seconds a request waits for lazy chord resolution
+    
+    # Parser Configuration
+    PARSER_WORKERS = 2  # processes parsing HTML off the event loop (0 = parse inline)
+    PARSER_BATCH_SIZE = 16  # pages sent to a worker per round-trip
+    PARSER_BATCH_DELAY = 0.005  # seconds to wait for a batch to fill before sending it
+    
+    # Snapshot Configuration
+    SNAPSHOT_PATH = "data/songs.snapshot"  # set to None to disable persistence
+    REVALIDATE_ON_STARTUP = True  # run an incremental crawl after loading a snapshot
+    GENERATION_RETENTION = 2  # cache generations kept readable, so cursors survive a crawl landing
+    
+    # Multi-worker Configuration
+    SHARED_CACHE = False  # uvicorn --workers N: one leader crawls, the others map its snapshots (POSIX)
+    LEADER_LOCK_PATH = "data/leader.lock"  # flock held by the crawling worker
+    SHARED_POLL_INTERVAL = 2  # seconds between follower checks of the published generation
+    
+    # Popular Songs Cache Configuration
+    POPULAR_CACHE_TTL = 300  # seconds a popular list is served before a background refresh
+    POPULAR_RETRY_INTERVAL = 30  # seconds before retrying a refresh that returned nothing
+    POPULAR_SOURCE = "site"  # "site": musicatm's hit list; "cache": most viewed cached songs (no crawl, always on followers)
+    POPULAR_LOCAL_SIZE = 100  # songs in the cache-derived popular list
+    
+    # Search Configuration
+    SEARCH_NGRAM_SIZE = 3
+    QUERY_CACHE_SIZE = 512  # /songs search results kept per cache generation (0 = disabled)
+    QUERY_CACHE_MAX_IDS = 2_000_000  # total row ids held by cached results (4 bytes each)
+    JSON_FRAGMENT_CACHE_SIZE = 20_000  # songs kept serialized for /songs responses (0 = disabled)
\ No newline at end of file
@@ -0,0 +1,332 @@
+"""Single-scan parsers for musicatm listing, song and chord pages
+
+Every field is located with str.find on the literal markup that surrounds it and
+read in place, instead of running one regex per field over the whole page. The
+results are the same as the core.patterns regexes; where the markup is not the
+expected shape (odd attribute order, empty values) the parser falls back to the
+matching regex so edge cases still agree with it.
+"""
+from typing import Any, List, Optional, Tuple
+from .patterns import AVATAR_PATTERN, BR_PATTERN, CHORD_IMG_PATTERN, TAG_PATTERN
+
+# Parse results are plain tuples so they pickle cheaply back from worker processes
+SongRef = Tuple[str, str, str]  # (href, song, singer)
+SongPage = Tuple[str, int, str, str]  # (lyrics, views, chord page URL, transcriber avatar URL)
+
+SECTION_TITLE = '<h2 class="panel-title"'
+SECTION_HEADING = 'เนื้อเพลงฮิตเพิ่มล่าสุด'
+MAIN_LIST = '<div class="list-group main_list">'
+COMMENT_PANEL = '<div class="panel panel-info"'
+COMMENT_PANEL_ID = 'id="comment_lyric_list"'
+HITSONG_LIST = '<div class="list-group right_suggestion_list" id="hitsong_list">'
+LYRICS_DIV = '<div class="lyric-content" id="lyric">'
+CHORD_BUTTON = '<a class="btn btn-block btn-success" href="'
+CHORD_IMG_DIV = '<div class="chord-guitar-img">'
+POSTPIC_CLASS = 'class="postpic"'
+VIEW_PREFIX = 'ดู'
+VIEW_SUFFIX = 'ครั้ง'
+
+
+def _section_bounds(html: str) -> Tuple[int, int]:
+    """(start, end) of the latest-songs list body, or (-1, -1)"""
+    title = html.find(SECTION_TITLE)
+    if title < 0:
+        return -1, -1
+    title_end = html.find('>', title + len(SECTION_TITLE))
+    if title_end < 0:
+        return -1, -1
+    heading = html.find(SECTION_HEADING, title_end + 1)
+    if heading < 0:
+        return -1, -1
+    heading_end = html.find('</h2>', heading + len(SECTION_HEADING))
+    if heading_end < 0:
+        return -1, -1
+    main_list = html.find(MAIN_LIST, heading_end + 5)
+    if main_list < 0:
+        return -1, -1
+    start = main_list + len(MAIN_LIST)
+    # The list body runs to the last </div> of the page
+    end = html.rfind('</div>', start)
+    return (start, end) if end >= 0 else (-1, -1)
+
+
+def _comment_panel(html: str, start: int, end: int) -> Tuple[int, int]:
+    """(tag start, tag end) of the comment panel that splits the section, or (-1, -1)"""
+    pos = start
+    while True:
+        tag = html.find(COMMENT_PANEL, pos, end)
+        if tag < 0:
+            return -1, -1
+        tag_end = html.find('>', tag + len(COMMENT_PANEL), end)
+        if tag_end < 0:
+            return -1, -1
+        if html.startswith(COMMENT_PANEL_ID, tag_end - len(COMMENT_PANEL_ID), tag_end) \
+                and tag_end - len(COMMENT_PANEL_ID) >= tag + len(COMMENT_PANEL):
+            return tag, tag_end + 1
+        pos = tag + 1
+
+
+def _hitsong_bounds(html: str, start: int, end: int) -> Tuple[int, int]:
+    """(start, end) of the hit songs list between start and end, or (-1, -1)"""
+    marker = html.find(HITSONG_LIST, start, end)
+    if marker < 0:
+        return -1, -1
+    body = marker + len(HITSONG_LIST)
+    # Greedy: the body ends at the last "</div> </div>" pair
+    closing = html.rfind('</div>', body, end)
+    while closing >= body:
+        inner = html[body:closing].rstrip()
+        if inner.endswith('</div>'):
+            return body, body + len(inner) - 6
+        closing = html.rfind('</div>', body, closing)
+    return -1, -1
+
+
+def _href(html: str, start: int, end: int) -> str:
+    pos = start
+    while True:
+        attr = html.find('href="', pos, end)
+        if attr < 0:
+            return ''
+        value = attr + 6
+        quote = html.find('"', value, end)
+        if quote < 0:
+            return ''
+        if quote > value:
+            return html[value:quote]
+        pos = attr + 1
+
+
+def _h3_text(html: str, start: int, end: int):
+    h3 = html.find('<h3>', start, end)
+    if h3 < 0:
+        return None
+    close = html.find('</h3>', h3 + 4, end)
+    if close < 0:
+        close = html.find('</header>', h3 + 4, end)
+        if close < 0:
+            return None
+    return html[h3 + 4:close]
+
+
+def _refs(html: str, start: int, end: int) -> List[SongRef]:
+    songs = []
+    pos = start
+    while True:
+        tag = html.find('<a ', pos, end)
+        if tag < 0:
+            break
+        tag_end = html.find('>', tag + 3, end)
+        if tag_end < 0:
+            break
+        close = html.find('</a>', tag_end + 1, end)
+        if close < 0:
+            break
+        pos = close + 4
+
+        text = _h3_text(html, tag, pos)
+        if text is not None:
+            text = ' '.join(text.split())
+            if ' - ' in text:
+                song_name, singer_name = text.split(' - ', 1)
+            else:
+                song_name, singer_name = text, ''
+            songs.append((_href(html, tag, pos), song_name.strip(), singer_name.strip()))
+    return songs
+
+
+def parse_listing(html: str, popular: bool = False) -> List[SongRef]:
+    """Extract (href, song, singer) refs from a listing page"""
+    start, end = _section_bounds(html)
+    if start < 0:
+        return []
+
+    panel_start, panel_end = _comment_panel(html, start, end)
+    if not popular:
+        return _refs(html, start, panel_start if panel_start >= 0 else end)
+
+    if panel_start < 0:
+        return []
+    hits_start, hits_end = _hitsong_bounds(html, panel_end, end)
+    if hits_start < 0:
+        return []
+    return _refs(html, hits_start, hits_end)
+
+
+def _views_span(html: str) -> Optional[Tuple[int, int]]:
+    """(start, end) of the number in the first "ดู N ครั้ง" label, or None"""
+    size = len(html)
+    pos = html.find(VIEW_PREFIX)
+    while pos >= 0:
+        i = pos + len(VIEW_PREFIX)
+        gap = i
+        while i < size and html[i].isspace():
+            i += 1
+        if i > gap:
+            digits = i
+            while i < size and (html[i].isdecimal() or html[i] == ','):
+                i += 1
+            if i > digits:
+                number_end = i
+                while i < size and html[i].isspace():
+                    i += 1
+                if i > number_end and html.startswith(VIEW_SUFFIX, i):
+                    return digits, number_end
+        pos = html.find(VIEW_PREFIX, pos + 1)
+    return None
+
+
+def parse_views(html: str) -> int:
+    """View count from the "ดู N ครั้ง" label (0 if missing or not a plain number)"""
+    span = _views_span(html)
+    if span is None:
+        return 0
+    try:
+        return int(html[span[0]:span[1]])
+    except ValueError:
+        return 0
+
+
+def _avatar_in_place(html: str) -> str:
+    """Avatar URL read from the usual <img ... src="..." class="postpic"> markup, or ''"""
+    marker = html.find(POSTPIC_CLASS)
+    if marker >= 0:
+        tag = html.rfind('<img', 0, marker)
+        if tag >= 0 and html.find('>', tag, marker) < 0:
+            attr = html.rfind('src="', tag + 5, marker)
+            if attr >= 0:
+                value = attr + 5
+                quote = html.find('"', value, marker)
+                if quote > value:
+                    return html[value:quote]
+    return ''
+
+
+def _avatar(html: str) -> str:
+    avatar = _avatar_in_place(html)
+    if avatar:
+        return avatar
+    # Unusual markup (other case, attributes in another order): let the regex decide
+    match = AVATAR_PATTERN.search(html)
+    return match.group(1) if match else ''
+
+
+def clean_lyrics(raw: str) -> str:
+    """Turn the lyrics <pre> body into plain text: <br> to newline, &nbsp; to space, drop tags
+
+    Runs as C-level passes that are skipped when their marker is absent; a per-tag
+    Python loop is slower than these on chord-annotated lyrics.
+    """
+    if '<br' in raw:
+        raw = BR_PATTERN.sub('\n', raw)
+    if '&nbsp;' in raw:
+        raw = raw.replace('&nbsp;', ' ')
+    if '<' in raw:
+        raw = TAG_PATTERN.sub('', raw)
+    return raw.strip()
+
+
+def _lyrics_span(html: str) -> Optional[Tuple[int, int]]:
+    """(start, end) of the lyrics <pre> body, or None"""
+    marker = html.find(LYRICS_DIV)
+    if marker < 0:
+        return None
+    pre = html.find('<pre', marker + len(LYRICS_DIV))
+    if pre < 0:
+        return None
+    pre_end = html.find('>', pre + 4)
+    if pre_end < 0:
+        return None
+    close = html.find('</pre>', pre_end + 1)
+    if close < 0:
+        return None
+    return pre_end + 1, close
+
+
+def _lyrics(html: str) -> str:
+    span = _lyrics_span(html)
+    return clean_lyrics(html[span[0]:span[1]]) if span else ''
+
+
+def _chord_button(html: str) -> str:
+    pos = html.find(CHORD_BUTTON)
+    while pos >= 0:
+        value = pos + len(CHORD_BUTTON)
+        quote = html.find('"', value)
+        if quote < 0:
+            return ''
+        if quote > value and html.startswith('>', quote + 1):
+            return html[value:quote]
+        pos = html.find(CHORD_BUTTON, pos + 1)
+    return ''
+
+
+def parse_song_page(html: str, base_url: str) -> SongPage:
+    """Extract lyrics, views, chord page URL and transcriber avatar URL from a song page"""
+    avatar = _avatar(html)
+    chord = _chord_button(html)
+    return (
+        _lyrics(html),
+        parse_views(html),
+        base_url + chord if chord else "",
+        base_url + avatar if avatar else ""
+    )
+
+
+def song_page_complete(html: str) -> bool:
+    """True once a page prefix holds every field parse_song_page reads
+
+    parse_song_page gives the same result on such a prefix as on the whole page, so
+    a streamed fetch can stop reading there. Pages missing a field (or using markup
+    only the regex fallback understands) never complete and are read in full.
+    """
+    # Cheapest and latest in the page first: the chord button follows the lyrics
+    return bool(_chord_button(html)) and _lyrics_span(html) is not None \
+        and _views_span(html) is not None and bool(_avatar_in_place(html))
+
+
+def views_complete(html: str) -> bool:
+    """True once a page prefix holds the view count label parse_views reads"""
+    return _views_span(html) is not None
+
+
+def parse_chord_page(html: str, base_url: str) -> str:
+    """Extract the chord image URL from a chord page"""
+    marker = html.find(CHORD_IMG_DIV)
+    if marker < 0:
+        return ""
+    img = html.find('<img', marker + len(CHORD_IMG_DIV))
+    if img >= 0:
+        img_end = html.find('>', img + 4)
+        if img_end >= 0:
+            attr = html.rfind('src="', img + 5, img_end)
+            if attr >= 0:
+                value = attr + 5
+                quote = html.find('"', value)
+                if quote > value:
+                    return base_url + html[value:quote]
+    match = CHORD_IMG_PATTERN.search(html, marker)
+    return base_url + match.group(1) if match else ""
+
+
+PARSERS = {
+    "listing": parse_listing,
+    "views": parse_views,
+    "song": parse_song_page,
+    "chord": parse_chord_page,
+}
+
+
+def parse_batch(jobs: List[Tuple[str, tuple]]) -> List[Tuple[bool, Any]]:
+    """Run a batch of (kind, args) parse jobs, returning (ok, result or error message) per job
+
+    Entry point of the parser worker processes; it lives here so a spawned worker
+    only imports core, not the songs package (FastAPI, the service) around it.
+    """
+    results = []
+    for kind, args in jobs:
+        try:
+            results.append((True, PARSERS[kind](*args)))
+        except Exception as e:
+            results.append((False, f"{type(e).__name__}: {e}"))
+    return results
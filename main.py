@@ -1,14 +1,42 @@
-from fastapi import FastAPI
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
 import uvicorn
-from modules.songs.controller import router as song_router
+from modules.songs.controller import router as song_router, song_service
+from modules.songs.cluster import SharedCache
 from core.config import Config
+from shared.metrics import REGISTRY
 from fastapi.middleware.cors import CORSMiddleware
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm the cache from the last snapshot, then revalidate it in the background"""
+    revalidation = None
+    if Config.SHARED_CACHE:
+        song_service.cluster = SharedCache(song_service)
+        song_service.cluster.elect()
+    # Followers map the snapshot instead of copying it into their own heap
+    if await song_service.load_snapshot(mapped=song_service.is_follower()) and Config.REVALIDATE_ON_STARTUP:
+        revalidation = song_service.trigger_crawl()
+    if song_service.cluster:
+        song_service.cluster.start()
+    if Config.SCHEDULER_ENABLED:
+        song_service.scheduler.start()
+    yield
+    await song_service.scheduler.stop()
+    if revalidation and not revalidation.done():
+        revalidation.cancel()
+    if song_service.cluster:
+        await song_service.cluster.stop()
+    await song_service.close()
+
 # Create FastAPI app
 app = FastAPI(
     title="Music Scraper API",
     description="API for scraping songs, lyrics, and chord images",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -19,6 +47,28 @@ app.add_middleware(
     allow_headers=["*"],   
 )
 
+REQUEST_DURATION = REGISTRY.histogram(
+    "toc_http_request_duration_seconds", "API request latency", ("method", "route", "status")
+)
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Label by route template, not raw path, to keep the series count bounded
+        route = request.scope.get("route")
+        REQUEST_DURATION.observe(
+            time.perf_counter() - started,
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=str(status)
+        )
+
 # Include routers
 app.include_router(song_router)
 
@@ -27,6 +77,11 @@ def root():
     """Root endpoint"""
     return {"message": "Music Scraper API", "version": "1.0.0"}
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Prometheus text exposition of crawl and API metrics"""
+    return PlainTextResponse(REGISTRY.render(), media_type=REGISTRY.CONTENT_TYPE)
+
 @app.get("/health")
 def health_check():
     """Health check endpoint"""
@@ -0,0 +1,217 @@
+import asyncio
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Sequence, Tuple
+from core.config import Config
+from shared.persisted import PersistedMap
+from .models import Song
+from .metrics import CHORD_DURATION, CHORD_LOOKUPS, CHORD_MEMO_ENTRIES, CHORD_QUEUE
+
+if TYPE_CHECKING:
+    from .service import AsyncSongService
+
+# Values of Config.CHORD_MODE
+EAGER = "eager"  # resolve every chord page during the crawl
+LAZY = "lazy"  # resolve when a song is served, waiting up to CHORD_LAZY_TIMEOUT
+BACKGROUND = "background"  # resolve in a low-priority queue after each crawl
+CHORD_MODES = (EAGER, LAZY, BACKGROUND)
+
+
+class ChordResolver:
+    """Memoized chord page URL -> chord image URL resolution
+
+    Chord pages almost never change, so every resolved image is kept in a bounded
+    LRU that is written to CHORD_CACHE_PATH and reloaded on startup. Concurrent
+    lookups of the same chord page share one fetch. Failed fetches are not memoized.
+    """
+
+    def __init__(
+        self,
+        service: "AsyncSongService",
+        mode: str = None,
+        max_entries: int = None,
+        path: str = None,
+        workers: int = None
+    ):
+        self.service = service
+        self.mode = mode or Config.CHORD_MODE
+        if self.mode not in CHORD_MODES:
+            raise ValueError(f"CHORD_MODE must be one of {CHORD_MODES}, got {self.mode!r}")
+        self.max_entries = max_entries or Config.CHORD_CACHE_SIZE
+        self.path = Config.CHORD_CACHE_PATH if path is None else path
+        self.workers = workers or Config.CHORD_BACKGROUND_WORKERS
+
+        self._images: OrderedDict[str, str] = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._queued: set[str] = set()
+        self._workers: List[asyncio.Task] = []
+        self._file = PersistedMap(self.path, "chord cache", lambda: dict(self._images))
+        CHORD_MEMO_ENTRIES.set_function(lambda: {(): len(self._images)})
+        CHORD_QUEUE.set_function(lambda: {(): len(self._queued)})
+
+    def get(self, chord_url: str) -> Optional[str]:
+        """Memoized image URL ("" = page has no image), or None if not resolved yet"""
+        image = self._images.get(chord_url)
+        if image is not None:
+            self._images.move_to_end(chord_url)
+        return image
+
+    def peek(self, chord_url: str) -> Optional[str]:
+        """get() without touching the LRU order, so it is safe off the event loop (export threads)"""
+        return self._images.get(chord_url)
+
+    def _store(self, chord_url: str, image: str):
+        self._images[chord_url] = image
+        self._images.move_to_end(chord_url)
+        while len(self._images) > self.max_entries:
+            self._images.popitem(last=False)
+        self._file.dirty = True
+
+    async def resolve(self, chord_url: str, max_retries: int = 2) -> str:
+        """Image URL for a chord page, fetching it only on a memo miss"""
+        image = self.get(chord_url)
+        if image is not None:
+            CHORD_LOOKUPS.inc(result="hit")
+            return image
+        CHORD_LOOKUPS.inc(result="miss")
+        if self.service.is_follower():
+            # Served without an image for now; the leader resolves it and the memo reload brings it in
+            return ""
+
+        task = self._inflight.get(chord_url)
+        if task is None:
+            task = self._inflight[chord_url] = asyncio.create_task(self._fetch(chord_url, max_retries))
+            task.add_done_callback(lambda t: self._inflight.pop(chord_url, None))
+            # Waiters may all be cancelled, so consume the exception here
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        # One caller giving up must not cancel the fetch for the others
+        return await asyncio.shield(task)
+
+    async def _fetch(self, chord_url: str, max_retries: int) -> str:
+        with CHORD_DURATION.time():
+            image = await self.service.fetch_parsed(chord_url, "chord", self.service.parser.parse_chord_page, max_retries, "chord")
+            if image is None:
+                return ""
+        self._store(chord_url, image)
+        return image
+
+    def fill(self, song: Song) -> Song:
+        """Song with chord_image filled from the memo when it is known (read-only, see peek)"""
+        if song.chord_image or not song.chord_url:
+            return song
+        image = self.peek(song.chord_url)
+        return song.model_copy(update={"chord_image": image}) if image else song
+
+    async def fill_page(self, songs: List[Song]) -> List[Song]:
+        """Fill chord images for songs about to be served (see serve_images)"""
+        images = await self.serve_images([song.chord_url for song in songs], [song.chord_image for song in songs])
+        return [
+            song if song.chord_image == image else song.model_copy(update={"chord_image": image})
+            for song, image in zip(songs, images)
+        ]
+
+    def _known_images(self, chord_urls: Sequence[str], chord_images: Sequence[str]) -> List[str]:
+        return [image or (self.get(url) or "" if url else "") for url, image in zip(chord_urls, chord_images)]
+
+    async def serve_images(self, chord_urls: Sequence[str], chord_images: Sequence[str]) -> List[str]:
+        """Chord image per row for rows about to be served
+
+        In lazy mode missing images are fetched, waiting at most CHORD_LAZY_TIMEOUT;
+        otherwise rows are filled from the memo and misses are queued.
+        """
+        images = self._known_images(chord_urls, chord_images)
+        missing = [url for url, image in zip(chord_urls, images) if url and not image and self.get(url) is None]
+        if not missing:
+            return images
+
+        if self.mode != LAZY or self.service.is_follower():
+            self.enqueue(missing)
+            return images
+
+        lookups = asyncio.gather(*(self.resolve(url) for url in set(missing)), return_exceptions=True)
+        try:
+            await asyncio.wait_for(lookups, Config.CHORD_LAZY_TIMEOUT)
+        except asyncio.TimeoutError:
+            # Still resolving in the background; later requests pick the result up
+            print(f"Chord resolution for {len(missing)} songs exceeded {Config.CHORD_LAZY_TIMEOUT}s, serving without images")
+        return self._known_images(chord_urls, images)
+
+    def enqueue(self, chord_urls: Iterable[str]):
+        """Queue unresolved chord pages for the background workers"""
+        if self.service.is_follower():
+            # Background workers run on the leader only
+            return
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        added = 0
+        for url in chord_urls:
+            if url and url not in self._queued and self.get(url) is None:
+                self._queued.add(url)
+                self._queue.put_nowait(url)
+                added += 1
+        if added and not self._workers:
+            self._workers = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    def enqueue_missing(self, chord_urls: Sequence[str], chord_images: Sequence[str]):
+        """Queue the chord pages of rows that have a chord URL but no image yet"""
+        self.enqueue(url for url, image in zip(chord_urls, chord_images) if url and not image)
+
+    def fill_images(self, chord_urls: Sequence[str], chord_images: Sequence[str]) -> Optional[Tuple[str, ...]]:
+        """chord_images with memoized images filled in, or None if nothing would change"""
+        get = self.peek
+        filled = tuple(image or (get(url) or "" if url else "") for url, image in zip(chord_urls, chord_images))
+        return filled if filled != tuple(chord_images) else None
+
+    async def _worker(self):
+        while True:
+            url = await self._queue.get()
+            try:
+                # Low priority: crawls get the limiter's capacity first
+                while self.service.is_crawling():
+                    await asyncio.sleep(1)
+                await self.resolve(url)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Background chord resolution failed for {url}: {type(e).__name__}: {e}")
+            finally:
+                self._queued.discard(url)
+                self._queue.task_done()
+            if self._queue.empty():
+                await self.persist()
+
+    def load(self) -> int:
+        """Load persisted chord images, returning how many were loaded"""
+        images = self._file.load()
+        if images is None:
+            return 0
+        for chord_url, image in images.items():
+            self._store(chord_url, image)
+        self._file.dirty = False
+        return len(self._images)
+
+    def save(self):
+        """Write the memo to CHORD_CACHE_PATH if it changed since the last save"""
+        # Followers only read the leader's memo
+        if not self.service.is_follower():
+            self._file.save()
+
+    async def persist(self):
+        """save() with the file write off the event loop"""
+        if not self.service.is_follower():
+            await self._file.persist()
+
+    async def close(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self.save()
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "memoized": len(self._images),
+            "queued": len(self._queued),
+            "in_flight": len(self._inflight),
+        }
@@ -0,0 +1,122 @@
+import asyncio
+import os
+from typing import TYPE_CHECKING, Optional
+from core.config import Config
+from shared.leader import FileLeaderLock
+from shared.persisted import atomic_write
+
+if TYPE_CHECKING:
+    from .service import AsyncSongService
+
+LEADER = "leader"
+FOLLOWER = "follower"
+
+
+def counter_path(snapshot_path: str) -> str:
+    """File holding the id of the generation last published at snapshot_path"""
+    return f"{snapshot_path}.generation"
+
+
+class SharedCache:
+    """Multi-worker mode: one uvicorn worker crawls, the others serve what it publishes
+
+    Workers elect a leader through LEADER_LOCK_PATH. The leader crawls as usual and,
+    after writing each generation's snapshot, bumps a generation counter file next
+    to it. Followers never fetch from the site (no crawls, popular lists or chord
+    pages) and never write the HTTP cache; they poll the counter and, when it moves,
+    map the snapshot (search index included) read-only and swap it in, and reload the leader's chord memo. When the
+    leader exits its lock is released and the next follower to poll takes over.
+    """
+
+    def __init__(self, service: "AsyncSongService", lock_path: str = None, poll_interval: float = None):
+        if not Config.SNAPSHOT_PATH:
+            raise RuntimeError("SHARED_CACHE needs SNAPSHOT_PATH: followers read the leader's snapshots")
+        self.service = service
+        self.lock = FileLeaderLock(lock_path or Config.LEADER_LOCK_PATH)
+        self.poll_interval = poll_interval or Config.SHARED_POLL_INTERVAL
+        self.counter_path = counter_path(Config.SNAPSHOT_PATH)
+        self.swaps = 0
+        self._chords_mtime: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self.lock.is_leader
+
+    @property
+    def role(self) -> str:
+        return LEADER if self.is_leader else FOLLOWER
+
+    def elect(self) -> str:
+        """Try to become the leader; returns this worker's role"""
+        if self.lock.try_acquire():
+            print(f"Worker {os.getpid()} is the crawl leader")
+        return self.role
+
+    def start(self):
+        """Follow the leader's generations (and stand by to replace it)"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._follow())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self.lock.release()
+
+    def publish(self, generation: int):
+        """Leader: announce that the snapshot on disk now holds generation"""
+        atomic_write(self.counter_path, str(generation).encode())
+
+    def published(self) -> Optional[int]:
+        try:
+            with open(self.counter_path) as f:
+                return int(f.read().strip())
+        except (OSError, ValueError):
+            return None
+
+    async def _follow(self):
+        while not self.is_leader:
+            try:
+                await self.sync()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Follower sync failed: {type(e).__name__}: {e}")
+            await asyncio.sleep(self.poll_interval)
+            if self.elect() == LEADER:
+                # The previous leader exited; catch up with its last snapshot and HTTP cache before crawling
+                await self.sync()
+                await self.service.load_http_cache()
+                self.service.trigger_crawl()
+
+    async def sync(self) -> bool:
+        """Swap in the published generation if it differs from the installed one"""
+        await self._sync_chords()
+        generation = self.published()
+        if generation is None or generation == self.service.get_generation():
+            return False
+        if not await self.service.install_snapshot(mapped=True):
+            return False
+        self.swaps += 1
+        return True
+
+    async def _sync_chords(self):
+        # Chord images resolved by the leader after its last crawl only reach the memo file
+        path = self.service.chords.path
+        try:
+            mtime = os.stat(path).st_mtime_ns if path else None
+        except OSError:
+            return
+        if mtime is not None and mtime != self._chords_mtime:
+            self._chords_mtime = mtime
+            await asyncio.to_thread(self.service.chords.load)
+
+    def stats(self) -> dict:
+        return {
+            "role": self.role,
+            "pid": os.getpid(),
+            "published_generation": self.published(),
+            "swaps": self.swaps,
+        }
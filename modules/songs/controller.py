@@ -1,30 +1,30 @@
-import asyncio
 import time
-from fastapi import APIRouter, Query, BackgroundTasks
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Header, HTTPException, Query, BackgroundTasks
+from fastapi.responses import StreamingResponse
+from itertools import chain
 from typing import Optional
 from .service import AsyncSongService
-from .dto import SongListResponse, SingerListResponse
-import csv
-import time
+from .index import SongSearchIndex
+from .dto import CrawlMode, SongListResponse, SingerListResponse, SongSort
+from .export import iter_csv, iter_ndjson, gzip_chunks
+from .query_cache import QueryCache
+from .cursor import encode_cursor, decode_cursor
+from .responses import SongFragments, json_response, make_etag, etag_matches, not_modified, song_list_body, songs_json
+from .metrics import FILTER_DURATION, FILTER_RESULTS, NOT_MODIFIED, PAGINATE_DURATION
 
 router = APIRouter(prefix="/songs", tags=["songs"])
 song_service = AsyncSongService()
+query_cache = QueryCache()
+song_fragments = SongFragments()
 
-# request counter (global for now)
-REQUEST_COUNTER = 1
-CRAWL_THRESHOLD = 1000
-LOCK = asyncio.Lock()
-
-async def maybe_trigger_crawl():
-    global REQUEST_COUNTER
-    async with LOCK:
-        if REQUEST_COUNTER % CRAWL_THRESHOLD == 0:
-            print("🚀 Threshold reached, refreshing cache...")
-            # run in background so requests don't block
-            asyncio.create_task(song_service.update_cache())
+# Same keys as the index orderings, for lists that have no index (e.g. popular songs)
+SORT_KEYS = {
+    "views": lambda s: -s.views,
+    "name": lambda s: s.song.lower(),
+    "singer": lambda s: (s.singer.lower(), s.song.lower()),
+}
 
-def apply_filters(songs, song=None, singer=None, lyric=None, min_views=None):
+def apply_filters(songs, song=None, singer=None, lyric=None, min_views=None, sort=None):
     if song:
         songs = [s for s in songs if song.lower() in s.song.lower()]
     if singer:
@@ -33,6 +33,8 @@ def apply_filters(songs, song=None, singer=None, lyric=None, min_views=None):
         songs = [s for s in songs if lyric.lower() in s.lyrics.lower()]
     if min_views:
         songs = [s for s in songs if getattr(s, "views", 0) >= min_views]
+    if sort:
+        songs = sorted(songs, key=SORT_KEYS[sort])
     return songs
 
 def paginate(items: list, page: int, page_size: int):
@@ -40,6 +42,46 @@ def paginate(items: list, page: int, page_size: int):
     end = start + page_size
     return items[start:end]
 
+# Types of the query values a /songs cursor carries; each may also be None
+SONGS_CURSOR_QUERY = (str, str, str, int, str)
+
+def resolve_cursor(cursor: str, kind: str, query_types: tuple):
+    """(generation, query, position) of a cursor; 400 if malformed, 410 once its generation is dropped
+
+    Cursors come back from clients, so every query value must be None or of its type in query_types.
+    """
+    try:
+        generation_id, query, position = decode_cursor(cursor, kind)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if len(query) != len(query_types) or not all(
+        value is None or type(value) is value_type for value, value_type in zip(query, query_types)
+    ):
+        raise HTTPException(status_code=400, detail="malformed cursor")
+    generation = song_service.generation(generation_id)
+    if generation is None:
+        raise HTTPException(status_code=410, detail="cursor expired: its cache generation was replaced, start again without it")
+    return generation, query, position
+
+async def song_page_response(generation, ids, start: int, page_size: int, kind: str, query: tuple, if_none_match: Optional[str]):
+    """One page of generation rows as pre-serialized JSON, with next_cursor, ETag and 304 handling"""
+    store = generation.songs
+    with PAGINATE_DURATION.time():
+        page_ids = ids[start:start + page_size]
+    images = await song_service.chords.serve_images(
+        [store.chord_url[i] for i in page_ids], [store.chord_image[i] for i in page_ids]
+    )
+    is_next = start + page_size < len(ids)
+    next_cursor = encode_cursor(kind, generation.id, query, start + page_size) if is_next else None
+    # Everything the body depends on, so a match can skip serialization entirely; the
+    # digest keeps ETags of equal generation ids from different processes apart
+    etag = make_etag(kind, generation.id, generation.digest, query, start, page_size, images)
+    if etag_matches(if_none_match, etag):
+        NOT_MODIFIED.inc()
+        return not_modified(etag)
+    body = song_list_body(song_fragments.page(generation, page_ids, images), len(page_ids), is_next, next_cursor)
+    return json_response(body, etag)
+
 @router.get("", response_model=SongListResponse)
 async def get_songs(
     page: int = Query(1, ge=1),
@@ -48,57 +90,139 @@ async def get_songs(
     singer: Optional[str] = None,
     lyric: Optional[str] = None,
     min_views: Optional[int] = Query(1, ge=1),
-    popular: bool = False
+    popular: bool = False,
+    sort: Optional[SongSort] = None,
+    cursor: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None)
 ):
-    global REQUEST_COUNTER
-    await maybe_trigger_crawl()
-    REQUEST_COUNTER += 1
+    """Filtered songs; with cursor (from next_cursor) its query and generation are used and page is ignored"""
+    if popular and not cursor:
+        songs_list = await song_service.get_popular_songs()
+        with FILTER_DURATION.time(source="popular"):
+            songs_list = apply_filters(songs_list, song, singer, lyric, min_views, sort=sort)
+        FILTER_RESULTS.observe(len(songs_list))
+        with PAGINATE_DURATION.time():
+            songs_page = paginate(songs_list, page, page_size)
+        songs_page = await song_service.resolve_chords(songs_page)
+        is_next = (page * page_size) < len(songs_list)
+        # Not tied to a cache generation, so the ETag comes from the body itself
+        body = song_list_body(songs_json(songs_page), len(songs_page), is_next)
+        etag = make_etag(body)
+        if etag_matches(if_none_match, etag):
+            NOT_MODIFIED.inc()
+            return not_modified(etag)
+        return json_response(body, etag)
 
-    songs_list = await song_service.get_songs_list(1, popular=True) if popular else song_service.get_songs()
-    songs_list = apply_filters(songs_list, song, singer, lyric, min_views)
+    if cursor:
+        # Pinned to the cursor's generation, so pages do not shift when a crawl lands
+        generation, query, start = resolve_cursor(cursor, "songs", SONGS_CURSOR_QUERY)
+        _, _, _, cursor_min_views, cursor_sort = query
+        if (cursor_min_views is not None and cursor_min_views < 1) or \
+                (cursor_sort is not None and cursor_sort not in SongSearchIndex.SORTS):
+            raise HTTPException(status_code=400, detail="malformed cursor")
+    else:
+        generation = song_service.current_generation()
+        query = query_cache.key(song, singer, lyric, min_views, sort)
+        start = (page - 1) * page_size
+    with FILTER_DURATION.time(source="cache"):
+        # Later pages of the same query slice the cached ids instead of searching again
+        ids = query_cache.search(generation, *query)
+    FILTER_RESULTS.observe(len(ids))
+    return await song_page_response(generation, ids, start, page_size, "songs", query, if_none_match)
 
-    total = len(songs_list)
-    songs_page = paginate(songs_list, page, page_size)
-    is_next = (page * page_size) < total
-    return SongListResponse(count=len(songs_page), songs=songs_page, is_next=is_next)
-
-@router.get("/singer")
+@router.get("/singer", response_model=SingerListResponse)
 async def get_singers(
     page: int = Query(1, ge=1),
-    page_size: int = Query(20, ge=1, le=100)
+    page_size: int = Query(20, ge=1, le=100),
+    q: Optional[str] = None,
+    cursor: Optional[str] = None
+):
+    """Singers in name order with their song counts; q keeps names starting with it (case-insensitive)"""
+    if cursor:
+        generation, (q,), start = resolve_cursor(cursor, "singers", (str,))
+    else:
+        generation = song_service.current_generation()
+        start = (page - 1) * page_size
+    singers = generation.singers
+    positions = singers.prefix(q) if q else range(len(singers))
+    page_positions = positions[start:start + page_size]
+    is_next = start + page_size < len(positions)
+    next_cursor = encode_cursor("singers", generation.id, (q,), start + page_size) if is_next else None
+    return SingerListResponse(
+        count=len(page_positions),
+        singers=[singers.names[p] for p in page_positions],
+        counts=[singers.counts[p] for p in page_positions],
+        is_next=is_next,
+        next_cursor=next_cursor
+    )
+
+# path, so names containing "/" (AC/DC) still reach the route
+@router.get("/singer/{name:path}", response_model=SongListResponse)
+async def get_singer_songs(
+    name: str,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None)
 ):
-    global REQUEST_COUNTER
-    await maybe_trigger_crawl()
-    REQUEST_COUNTER += 1
+    """Songs of one singer (exact name, else case-insensitive), read from the singer index"""
+    if cursor:
+        generation, (cursor_name,), start = resolve_cursor(cursor, "singer_songs", (str,))
+        if cursor_name is None:
+            raise HTTPException(status_code=400, detail="malformed cursor")
+        if cursor_name.lower() != name.lower():
+            raise HTTPException(status_code=400, detail="cursor belongs to another singer")
+    else:
+        generation = song_service.current_generation()
+        start = (page - 1) * page_size
+    position = generation.singers.find(name)
+    if position is None:
+        raise HTTPException(status_code=404, detail=f"no cached songs by {name!r}")
+    name = generation.singers.names[position]
+    ids = generation.singers.song_ids(position)
+    return await song_page_response(generation, ids, start, page_size, "singer_songs", (name,), if_none_match)
 
-    singers = list(song_service.get_singers())
-    singers_page = paginate(singers, page, page_size)
-    is_next = (page * page_size) < len(singers)
-    return SingerListResponse(count=len(singers_page), singers=singers_page, is_next=is_next)
+def export_response(chunks, media_type: str, filename: str, gzip: bool) -> StreamingResponse:
+    if gzip:
+        chunks = gzip_chunks(chunks)
+        media_type = "application/gzip"
+        filename += ".gz"
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
 
 @router.get("/csv")
-async def download_csv():
-    global REQUEST_COUNTER
-    await maybe_trigger_crawl()
-    REQUEST_COUNTER += 1
+async def download_csv(gzip: bool = False):
+    songs_popular_list = await song_service.get_popular_songs()
+    songs_list = song_service.current_generation().songs
+    # Rows are written lazily from the snapshot, so memory stays flat however large the export
+    songs = map(song_service.chords.fill, chain(songs_popular_list, songs_list))
+    return export_response(iter_csv(songs), "text/csv; charset=utf-8", "songs.csv", gzip)
 
-    songs_popular_list = await song_service.get_songs_list(1, popular=True)
-    songs_list = song_service.get_songs()
-    songs = songs_popular_list + songs_list
-
-    filename = "songs.csv"
-    with open(filename, "w", encoding="utf-8-sig", newline="") as f:
-        writer = csv.writer(f, quoting=csv.QUOTE_ALL)
-        writer.writerow(["Song", "Singer", "Lyrics", "Chord Image URL", "Views"])
-        for s in songs:
-            writer.writerow([s.song, s.singer, s.lyrics, s.chord_image, getattr(s, "views", 0)])
-
-    return FileResponse(filename, media_type="text/csv", filename=filename)
+@router.get("/ndjson")
+async def download_ndjson(gzip: bool = False):
+    songs_popular_list = await song_service.get_popular_songs()
+    songs_list = song_service.current_generation().songs
+    songs = map(song_service.chords.fill, chain(songs_popular_list, songs_list))
+    return export_response(iter_ndjson(songs), "application/x-ndjson", "songs.ndjson", gzip)
 
 @router.get("/crawler")
-async def crawl_new_songs():
+async def crawl_new_songs(full: bool = False, mode: Optional[CrawlMode] = None):
+    """Run a crawl now through the scheduler (mode overrides full; default: new-song discovery)"""
     start_time = time.time()
-    res = await song_service.update_cache()
+    res = await song_service.scheduler.run_now(mode or ("full" if full else "incremental"))
     elapsed_time = time.time() - start_time
     print(f"Crawling completed in {elapsed_time:.2f} seconds")
     return res
+
+@router.get("/cache/stats")
+async def query_cache_stats():
+    """Hit/miss counters of the /songs search result cache"""
+    return query_cache.stats()
+
+@router.get("/crawler/status")
+async def crawler_status():
+    """Live progress of the current (or last) crawl"""
+    return song_service.crawl_status()
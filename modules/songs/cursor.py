@@ -0,0 +1,23 @@
+import base64
+import json
+from typing import Tuple
+
+
+def encode_cursor(kind: str, generation: int, query: tuple, position: int) -> str:
+    """Opaque pagination token: listing kind, cache generation, normalized query and next row position"""
+    payload = json.dumps([kind, generation, list(query), position], ensure_ascii=False, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).rstrip(b"=").decode()
+
+
+def decode_cursor(token: str, kind: str) -> Tuple[int, tuple, int]:
+    """(generation, query, position) of a token from encode_cursor; ValueError if malformed or of another kind"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        token_kind, generation, query, position = payload
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"malformed cursor: {e}") from None
+    if not isinstance(generation, int) or not isinstance(query, list) or not isinstance(position, int) or position < 0:
+        raise ValueError("malformed cursor")
+    if token_kind != kind:
+        raise ValueError(f"cursor belongs to another listing ({token_kind!r})")
+    return generation, tuple(query), position
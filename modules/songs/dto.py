@@ -1,11 +1,18 @@
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import List, Literal, Optional
 from .models import Song
 
+# Orderings GET /songs can serve from the prebuilt index permutations
+SongSort = Literal["views", "name", "singer"]
+# Values of scheduler.CRAWL_MODES accepted by the manual crawl trigger
+CrawlMode = Literal["full", "incremental", "views"]
+
 class SongListResponse(BaseModel):
     count: int
     songs: List[Song]
     is_next: bool
+    # Opaque token for the next page, pinned to the cache generation this page came from
+    next_cursor: Optional[str] = None
 
 class SongQueryParams(BaseModel):
     page: Optional[int] = 1
@@ -16,4 +23,7 @@ class SongQueryParams(BaseModel):
 class SingerListResponse(BaseModel):
     count: int
     singers: List[str]
-    is_next: bool
\ No newline at end of file
+    # Number of cached songs per singer, aligned with singers
+    counts: List[int] = []
+    is_next: bool
+    next_cursor: Optional[str] = None
\ No newline at end of file
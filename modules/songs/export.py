@@ -0,0 +1,55 @@
+import csv
+import io
+import json
+import zlib
+from typing import Iterable, Iterator
+from .models import Song
+
+CSV_HEADER = ["Song", "Singer", "Lyrics", "Chord Image URL", "Views"]
+CHUNK_SIZE = 64 * 1024  # flush roughly every 64 KiB of output
+
+
+def iter_csv(songs: Iterable[Song], chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield CSV bytes in chunks, writing one row at a time into a reusable buffer"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, quoting=csv.QUOTE_ALL)
+    # BOM keeps Excel reading Thai text as UTF-8, same as the old utf-8-sig file
+    buffer.write("\ufeff")
+    writer.writerow(CSV_HEADER)
+
+    for s in songs:
+        writer.writerow([s.song, s.singer, s.lyrics, s.chord_image, getattr(s, "views", 0)])
+        if buffer.tell() >= chunk_size:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def iter_ndjson(songs: Iterable[Song], chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield newline-delimited JSON, one song object per line"""
+    lines = []
+    size = 0
+    for s in songs:
+        line = json.dumps(s.model_dump(), ensure_ascii=False) + "\n"
+        lines.append(line)
+        size += len(line)
+        if size >= chunk_size:
+            yield "".join(lines).encode("utf-8")
+            lines.clear()
+            size = 0
+
+    if lines:
+        yield "".join(lines).encode("utf-8")
+
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Compress a chunk stream into a single gzip member without buffering the whole body"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
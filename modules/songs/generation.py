@@ -0,0 +1,52 @@
+from typing import Tuple
+from .index import SongSearchIndex
+from .singers import SingerIndex
+from .store import SongStore
+
+
+class SongGeneration:
+    """One installed crawl result: songs keyed by href plus everything derived from them
+
+    A generation is never mutated after it is built. Crawls build a new one and the
+    service swaps it in with a single assignment, so readers always see a complete set.
+    Ids are only unique within a process (without a snapshot they restart at 1), so
+    anything handed to clients that must identify the content also uses digest.
+    """
+
+    __slots__ = ("id", "songs", "singers", "index", "digest")
+
+    def __init__(self, id: int, songs: SongStore, singers: SingerIndex, index: SongSearchIndex, digest: str):
+        self.id = id
+        self.songs = songs
+        self.singers = singers
+        self.index = index
+        self.digest = digest
+
+    @classmethod
+    def from_store(
+        cls,
+        id: int,
+        songs: SongStore,
+        index: SongSearchIndex = None,
+        singers: SingerIndex = None,
+        digest: str = None
+    ) -> "SongGeneration":
+        """Build a generation around a store, reusing derived indexes that are still valid for it"""
+        if index is None:
+            index = SongSearchIndex(songs)
+        if singers is None:
+            singers = SingerIndex(songs.singer)
+        if digest is None:
+            digest = songs.digest()
+        return cls(id, songs, singers, index, digest)
+
+    @classmethod
+    def empty(cls) -> "SongGeneration":
+        return cls.from_store(0, SongStore.empty())
+
+    @property
+    def hrefs(self) -> Tuple[str, ...]:
+        return self.songs.hrefs
+
+    def __len__(self) -> int:
+        return len(self.songs)
@@ -0,0 +1,243 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import TYPE_CHECKING, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+from core.config import Config
+from .snapshot import StrColumn
+
+if TYPE_CHECKING:
+    from .store import SongStore
+
+
+class SortedPostings:
+    """Read-only gram -> posting list lookup over sorted grams and their concatenated ids
+
+    This is the form a field is saved in (see NgramField.sections), so it can be used
+    straight from a memory-mapped snapshot without building a dict.
+    """
+
+    def __init__(self, grams: Sequence[str], starts: Sequence[int], ids: Sequence[int]):
+        self.grams = grams
+        self.starts = starts
+        self.ids = ids
+
+    def get(self, gram: str) -> Optional[Sequence[int]]:
+        k = bisect_left(self.grams, gram)
+        if k < len(self.grams) and self.grams[k] == gram:
+            return self.ids[self.starts[k]:self.starts[k + 1]]
+        return None
+
+
+class NgramField:
+    """Pre-lowercased text column with a character n-gram inverted index"""
+
+    def __init__(self, values: Sequence[str], n: int):
+        self.n = n
+        self.values: List[str] = [v.lower() for v in values]
+        self.postings: Dict[str, array] = {}
+
+        # Character n-grams need no word boundaries, so Thai text indexes as-is.
+        # Ids are appended in ascending order, which keeps every posting list sorted.
+        for doc_id, text in enumerate(self.values):
+            grams = {text[i:i + n] for i in range(len(text) - n + 1)}
+            for gram in grams:
+                posting = self.postings.get(gram)
+                if posting is None:
+                    posting = self.postings[gram] = array('I')
+                posting.append(doc_id)
+
+    @classmethod
+    def from_sections(cls, sections: Mapping[str, Sequence], prefix: str, n: int) -> "NgramField":
+        """Field over columns written by sections(), used in place (e.g. from a mapped snapshot)"""
+        field = object.__new__(cls)
+        field.n = n
+        field.values = sections[f"{prefix}.lower"]
+        field.postings = SortedPostings(sections[f"{prefix}.grams"], sections[f"{prefix}.starts"], sections[f"{prefix}.ids"])
+        return field
+
+    def sections(self, prefix: str) -> Dict[str, Union[Sequence[str], array]]:
+        """Lowered text, sorted grams, posting starts and concatenated posting ids"""
+        grams = sorted(self.postings)
+        starts = array('q', [0])
+        ids = array('I')
+        for gram in grams:
+            ids.extend(self.postings[gram])
+            starts.append(len(ids))
+        return {
+            f"{prefix}.lower": self.values,
+            f"{prefix}.grams": grams,
+            f"{prefix}.starts": starts,
+            f"{prefix}.ids": ids,
+        }
+
+    def candidates(self, term: str) -> Optional[List[int]]:
+        """Sorted ids whose text may contain term, or None if term is too short to use the index"""
+        if len(term) < self.n:
+            return None
+
+        postings = []
+        for gram in {term[i:i + self.n] for i in range(len(term) - self.n + 1)}:
+            posting = self.postings.get(gram)
+            if posting is None:
+                return []
+            postings.append(posting)
+        postings.sort(key=len)
+
+        result = list(postings[0])
+        for posting in postings[1:]:
+            size = len(posting)
+            kept = []
+            for doc_id in result:
+                pos = bisect_left(posting, doc_id)
+                if pos < size and posting[pos] == doc_id:
+                    kept.append(doc_id)
+            result = kept
+            if not result:
+                break
+        return result
+
+    def matches(self, term: str, ids: Optional[List[int]] = None) -> List[int]:
+        """Ids whose lowered text contains term as an exact substring"""
+        values = self.values
+        if ids is None:
+            ids = self.candidates(term)
+        if isinstance(values, StrColumn):
+            # Mapped from a snapshot: match the bytes instead of decoding every row
+            return values.containing(term, ids)
+        if ids is None:
+            return [i for i, text in enumerate(values) if term in text]
+        return [i for i in ids if term in values[i]]
+
+
+def _ordering(keys: Sequence) -> Tuple[array, array]:
+    """(ids sorted by key, rank of each id in that order); ties keep cache order"""
+    order = sorted(range(len(keys)), key=keys.__getitem__)
+    rank = [0] * len(order)
+    for position, doc_id in enumerate(order):
+        rank[doc_id] = position
+    return array('I', order), array('I', rank)
+
+
+class SongSearchIndex:
+    """Search index over one cache generation of songs (ids are row positions in its store)
+
+    Besides the n-gram fields it keeps prebuilt orderings by views (most viewed first),
+    song name and singer, so sorting and min_views never sort the whole generation.
+    """
+
+    SORTS = ("views", "name", "singer")
+    FIELDS = ("song", "singer", "lyrics")
+
+    def __init__(self, songs: "SongStore", n: int = None):
+        n = n or getattr(Config, 'SEARCH_NGRAM_SIZE', 3)
+        self.size = len(songs)
+        self.song = NgramField(songs.song, n)
+        self.singer = NgramField(songs.singer, n)
+        self.lyrics = NgramField(songs.lyrics, n)
+        self.by_name = _ordering(self.song.values)
+        self.by_singer = _ordering([(singer, name) for singer, name in zip(self.singer.values, self.song.values)])
+        self._set_views(songs.views)
+
+    @classmethod
+    def from_sections(cls, views: Sequence[int], sections: Mapping[str, Sequence], n: int) -> "SongSearchIndex":
+        """Index over sections written by sections(), e.g. mapped from a snapshot instead of rebuilt"""
+        index = object.__new__(cls)
+        index.size = len(views)
+        for name in cls.FIELDS:
+            setattr(index, name, NgramField.from_sections(sections, name, n))
+        index.by_name = (sections["by_name.order"], sections["by_name.rank"])
+        index.by_singer = (sections["by_singer.order"], sections["by_singer.rank"])
+        index._set_views(views)
+        return index
+
+    def sections(self) -> Dict[str, Union[Sequence[str], array]]:
+        """Everything but the views ordering (which follows view refreshes) as flat columns"""
+        sections = {}
+        for name in self.FIELDS:
+            sections.update(getattr(self, name).sections(name))
+        sections["by_name.order"], sections["by_name.rank"] = self.by_name
+        sections["by_singer.order"], sections["by_singer.rank"] = self.by_singer
+        return sections
+
+    def _set_views(self, views: array):
+        # Shared with the store, not copied
+        self.views = views
+        self.by_views = _ordering([-v for v in views])
+        # Views in by_views order, negated so they ascend and min_views is a bisect
+        self.sorted_views = array('q', (-views[i] for i in self.by_views[0]))
+
+    def with_views(self, views: array) -> "SongSearchIndex":
+        """Copy of this index sharing the text fields and text orderings, with new view counts"""
+        clone = object.__new__(SongSearchIndex)
+        clone.__dict__.update(self.__dict__)
+        clone._set_views(views)
+        return clone
+
+    def ordering(self, sort: str) -> Tuple[array, array]:
+        """(ids in sort order, rank per id) for one of SORTS"""
+        if sort == "views":
+            return self.by_views
+        if sort == "name":
+            return self.by_name
+        if sort == "singer":
+            return self.by_singer
+        raise ValueError(f"sort must be one of {self.SORTS}, got {sort!r}")
+
+    def at_least(self, min_views: int) -> array:
+        """Ids with views >= min_views, most viewed first"""
+        count = bisect_right(self.sorted_views, -min_views)
+        return self.by_views[0][:count]
+
+    def top_views(self, limit: int) -> List[int]:
+        """Ids of the limit most viewed songs"""
+        return list(self.by_views[0][:limit])
+
+    def search(
+        self,
+        song: str = None,
+        singer: str = None,
+        lyric: str = None,
+        min_views: int = None,
+        sort: str = None
+    ) -> List[int]:
+        """Return ids matching every given filter, same semantics as a linear scan
+
+        Ids come in cache order, or in the order of sort (views, name or singer).
+        """
+        terms = [
+            (field, term.lower())
+            for field, term in ((self.song, song), (self.singer, singer), (self.lyrics, lyric))
+            if term
+        ]
+
+        ids: Optional[List[int]] = None
+        if terms:
+            # Intersect the most selective posting lists first, then verify substrings
+            lookups = [(field, term, field.candidates(term)) for field, term in terms]
+            lookups.sort(key=lambda item: self.size + 1 if item[2] is None else len(item[2]))
+            for field, term, candidates in lookups:
+                if ids is None:
+                    ids = field.matches(term, candidates)
+                else:
+                    ids = field.matches(term, ids)
+                if not ids:
+                    return []
+
+        if ids is None:
+            # No text filter: answer straight from the prebuilt orderings
+            if min_views:
+                ids = self.at_least(min_views)
+                if sort == "views":
+                    return list(ids)
+                if sort is None:
+                    return sorted(ids)
+                return sorted(ids, key=self.ordering(sort)[1].__getitem__)
+            if sort is None:
+                return list(range(self.size))
+            return list(self.ordering(sort)[0])
+
+        if min_views:
+            views = self.views
+            ids = [i for i in ids if views[i] >= min_views]
+        if sort is not None:
+            ids = sorted(ids, key=self.ordering(sort)[1].__getitem__)
+        return list(ids)
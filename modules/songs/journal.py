@@ -0,0 +1,138 @@
+import json
+import os
+import time
+from typing import Dict, List, Set, Tuple
+from core.config import Config
+from .models import Song
+from .parsing import SongRef
+from .store import SongStore
+
+OrderKey = Tuple[int, int]  # (listing page, position on page)
+
+
+class CrawlJournal:
+    """Append-only JSON-lines log of a crawl in progress, so a new crawl can resume it
+
+    The first line describes the crawl (mode, listing pages, start time). Then every
+    listing page that was fetched gets a line with the refs taken from it, every
+    song that was crawled gets a line with its full record, and every song whose page
+    is gone gets a line so it is not asked for again. Each resume adds a line too,
+    counted in resumes. Lines are written as work finishes; a torn last line (crash
+    mid-write) is ignored on reading. Failed fetches are not journaled, so resuming
+    retries them.
+    """
+
+    def __init__(self, path: str, mode: str, pages: int):
+        self.path = path
+        self.mode = mode
+        self.pages_total = pages
+        self.pages: Dict[int, List[Tuple[int, SongRef]]] = {}
+        self.songs: Dict[OrderKey, Tuple[str, Song]] = {}
+        self.gone: Set[OrderKey] = set()
+        self.resumes = 0
+        self._file = None
+
+    @classmethod
+    def open(cls, path: str, mode: str, pages: int, max_age: float = None) -> "CrawlJournal":
+        """Resume the journal at path if it is for the same crawl and recent enough, else start a new one"""
+        journal = cls(path, mode, pages)
+        max_age = Config.CRAWL_JOURNAL_MAX_AGE if max_age is None else max_age
+        if journal._load(max_age):
+            print(f"Resuming {mode} crawl from {path}: {len(journal.pages)} listing pages, {len(journal.songs)} songs already done")
+            journal._truncate_torn_tail()
+            journal._file = open(path, "a", encoding="utf-8")
+            journal.resumes += 1
+            journal._append({"resumed_at": time.time()})
+        else:
+            journal._start()
+        return journal
+
+    def _load(self, max_age: float) -> bool:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                lines = f.readlines()
+        except OSError:
+            return False
+        if not lines:
+            return False
+        try:
+            header = json.loads(lines[0])
+        except ValueError:
+            return False
+        if header.get("mode") != self.mode or header.get("pages") != self.pages_total \
+                or time.time() - header.get("started_at", 0) > max_age:
+            return False
+
+        for line in lines[1:]:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # Torn write of a crashed run; open() cuts it off before appending again
+                continue
+            if "resumed_at" in entry:
+                self.resumes += 1
+            elif "refs" in entry:
+                self.pages[entry["page"]] = [(position, tuple(ref)) for position, ref in entry["refs"]]
+            elif "gone" in entry:
+                self.gone.add((entry["page"], entry["position"]))
+            else:
+                href, *fields = entry["song"]
+                song, singer, lyrics, chord_image, views, song_transcriber, chord_url = fields
+                self.songs[(entry["page"], entry["position"])] = (href, Song(
+                    song=song,
+                    singer=singer,
+                    lyrics=lyrics,
+                    chord_image=chord_image,
+                    views=views,
+                    song_transcriber=song_transcriber,
+                    chord_url=chord_url
+                ))
+        return True
+
+    def _truncate_torn_tail(self):
+        # Appending after a partial last line would glue the next entry onto it
+        with open(self.path, "rb+") as f:
+            data = f.read()
+            end = data.rfind(b"\n") + 1
+            if end < len(data):
+                f.truncate(end)
+
+    def _start(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(self.path, "w", encoding="utf-8")
+        self._append({"mode": self.mode, "pages": self.pages_total, "started_at": time.time()})
+
+    def _append(self, entry: dict):
+        # One write per line, flushed so a killed process keeps everything before it
+        self._file.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+        self._file.flush()
+
+    def page_done(self, page: int, refs: List[Tuple[int, SongRef]]):
+        """Record a fetched listing page and the (position, ref) pairs taken from it"""
+        self.pages[page] = refs
+        self._append({"page": page, "refs": refs})
+
+    def song_done(self, key: OrderKey, href: str, song: Song):
+        self.songs[key] = (href, song)
+        self._append({"page": key[0], "position": key[1], "song": SongStore.record_of(href, song)})
+
+    def song_gone(self, key: OrderKey, href: str):
+        """Record a song whose page no longer exists, so a resume leaves it out instead of retrying"""
+        self.gone.add(key)
+        self._append({"page": key[0], "position": key[1], "gone": href})
+
+    def close(self):
+        """Stop writing but keep the file, so the next crawl resumes from it"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def discard(self):
+        """The crawl completed: drop the journal"""
+        self.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
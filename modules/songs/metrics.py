@@ -0,0 +1,133 @@
+import time
+from typing import Optional
+from shared.metrics import REGISTRY
+
+SIZE_BUCKETS = (1_000, 10_000, 50_000, 100_000, 250_000, 500_000, 1_000_000, 5_000_000)
+
+# Fetch stage (kind: listing, song, chord, page)
+FETCH_REQUESTS = REGISTRY.counter(
+    "toc_fetch_requests_total", "Outbound page requests by page kind and outcome", ("kind", "status")
+)
+FETCH_RETRIES = REGISTRY.counter(
+    "toc_fetch_retries_total", "Outbound requests that were retried", ("kind",)
+)
+FETCH_BYTES = REGISTRY.counter(
+    "toc_fetch_bytes_total", "Page body bytes downloaded (after transfer decoding)", ("kind",)
+)
+FETCH_EARLY_STOPS = REGISTRY.counter(
+    "toc_fetch_early_stops_total", "Streamed fetches that stopped reading once the needed markup was in", ("kind",)
+)
+FETCH_BYTES_SAVED = REGISTRY.counter(
+    "toc_fetch_bytes_saved_total", "Body bytes left unread by streamed fetches (Content-Length minus bytes read)", ("kind",)
+)
+HTTP_CACHE_LOOKUPS = REGISTRY.counter(
+    "toc_http_cache_lookups_total",
+    "Cacheable fetches by outcome: fresh, not_modified, unchanged, changed or miss", ("kind", "result")
+)
+HTTP_CACHE_BYTES = REGISTRY.gauge("toc_http_cache_bytes", "Bytes of page bodies and parse results in the HTTP cache")
+FETCH_DURATION = REGISTRY.histogram(
+    "toc_fetch_duration_seconds", "Time until response headers (or failure) for one attempt, including the limiter wait", ("kind",)
+)
+
+RETRY_BUDGET_EXHAUSTED = REGISTRY.counter(
+    "toc_retry_budget_exhausted_total", "Failed requests not retried because the crawl's retry budget was used up", ("kind",)
+)
+CIRCUIT_OPEN = REGISTRY.gauge("toc_circuit_open", "1 while the fetch circuit breaker is open or probing")
+
+LIMITER_LIMIT = REGISTRY.gauge("toc_limiter_limit", "Adaptive in-flight request limit per host", ("host",))
+LIMITER_IN_FLIGHT = REGISTRY.gauge("toc_limiter_in_flight", "Requests currently in flight per host", ("host",))
+
+# Parse stage (kind: listing, song, chord, views)
+PARSE_DURATION = REGISTRY.histogram(
+    "toc_parse_duration_seconds", "Time from submitting a page to the parser until its result is back", ("kind",)
+)
+PARSE_SKIPS = REGISTRY.counter(
+    "toc_parse_skips_total", "Parses skipped because the page body hash matched a stored result", ("kind",)
+)
+
+# Chord resolution (chord page fetch + parse on a memo miss)
+CHORD_DURATION = REGISTRY.histogram(
+    "toc_chord_resolution_duration_seconds", "Time to fetch and parse one chord page"
+)
+CHORD_LOOKUPS = REGISTRY.counter("toc_chord_lookups_total", "Chord image lookups by memo result", ("result",))
+CHORD_MEMO_ENTRIES = REGISTRY.gauge("toc_chord_memo_entries", "Chord page URLs with a memoized image")
+CHORD_QUEUE = REGISTRY.gauge("toc_chord_queue", "Chord pages waiting for background resolution")
+
+# API side
+FILTER_DURATION = REGISTRY.histogram(
+    "toc_filter_duration_seconds", "Time spent filtering songs for one request", ("source",),
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+)
+QUERY_CACHE_LOOKUPS = REGISTRY.counter("toc_query_cache_lookups_total", "/songs search result cache lookups", ("result",))
+QUERY_CACHE_ENTRIES = REGISTRY.gauge("toc_query_cache_entries", "Search results held by the query cache")
+JSON_FRAGMENT_LOOKUPS = REGISTRY.counter(
+    "toc_json_fragment_lookups_total", "Pre-serialized song lookups for /songs responses", ("result",)
+)
+NOT_MODIFIED = REGISTRY.counter("toc_not_modified_total", "/songs requests answered 304 Not Modified")
+PAGINATE_DURATION = REGISTRY.histogram(
+    "toc_paginate_duration_seconds", "Time spent paginating one response",
+    buckets=(0.00001, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05)
+)
+FILTER_RESULTS = REGISTRY.histogram(
+    "toc_filter_results", "Songs matched by one filtered request", buckets=(0, 1, 10, 100, 1_000, 10_000, 100_000)
+)
+
+# Crawl level
+CRAWLS = REGISTRY.counter("toc_crawls_total", "Finished crawls by mode and outcome", ("mode", "outcome"))
+CRAWL_DURATION = REGISTRY.histogram(
+    "toc_crawl_duration_seconds", "Wall time of one crawl", ("mode",),
+    buckets=(1, 5, 15, 30, 60, 120, 300, 600, 1200, 3600)
+)
+CRAWL_SONGS = REGISTRY.counter("toc_crawl_songs_total", "Songs processed by crawls", ("mode",))
+CACHE_SONGS = REGISTRY.gauge("toc_cache_songs", "Songs in the installed cache generation")
+CACHE_GENERATION = REGISTRY.gauge("toc_cache_generation", "Id of the installed cache generation")
+
+
+class CrawlProgress:
+    """Live counters for the crawl that is currently running"""
+
+    def __init__(self, mode: str, pages_total: int):
+        self.mode = mode
+        self.pages_total = pages_total
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.outcome: Optional[str] = None
+        self.pages_done = 0
+        self.refs_found = 0
+        self.songs_done = 0
+        self.chords_done = 0
+        self.errors = 0
+        # Listing pages and songs whose fetch failed (the crawl result is incomplete)
+        self.pages_failed = 0
+        self.songs_failed = 0
+        # Songs whose page the site says is gone (404, 403); left out of the crawl
+        self.songs_gone = 0
+        self.bytes_saved = 0
+        self.queues: dict = {}
+
+    def finish(self, outcome: str):
+        self.finished_at = time.time()
+        self.outcome = outcome
+
+    def to_dict(self) -> dict:
+        end = self.finished_at or time.time()
+        elapsed = end - self.started_at
+        return {
+            "mode": self.mode,
+            "running": self.finished_at is None,
+            "outcome": self.outcome,
+            "started_at": self.started_at,
+            "elapsed_seconds": round(elapsed, 2),
+            "pages_done": self.pages_done,
+            "pages_total": self.pages_total,
+            "refs_found": self.refs_found,
+            "songs_done": self.songs_done,
+            "chords_done": self.chords_done,
+            "errors": self.errors,
+            "pages_failed": self.pages_failed,
+            "songs_failed": self.songs_failed,
+            "songs_gone": self.songs_gone,
+            "bytes_saved": self.bytes_saved,
+            "songs_per_second": round(self.songs_done / elapsed, 2) if elapsed > 0 else 0.0,
+            "queues": {name: queue.qsize() for name, queue in self.queues.items()},
+        }
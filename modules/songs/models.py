@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 class Song(BaseModel):
     song: str
@@ -6,4 +6,6 @@ class Song(BaseModel):
     lyrics: str
     chord_image: str
     views: int
-    song_transcriber: str
\ No newline at end of file
+    song_transcriber: str
+    # Chord page the image is resolved from; internal, never serialized
+    chord_url: str = Field(default="", exclude=True)
\ No newline at end of file
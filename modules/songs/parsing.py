@@ -0,0 +1,102 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional, Tuple
+from core.config import Config
+from .metrics import PARSE_DURATION
+from core.parser import (
+    PARSERS, SongRef, SongPage, parse_batch, parse_listing, parse_views, parse_song_page, parse_chord_page,
+    song_page_complete, views_complete
+)
+
+EMPTY_SONG_PAGE: SongPage = ("", 0, "", "")
+
+
+class ParserBackend:
+    """Runs HTML parsing in a process pool so the event loop keeps serving requests
+
+    Jobs are collected into small batches (PARSER_BATCH_SIZE, or whatever arrived
+    within PARSER_BATCH_DELAY) to amortise the IPC round-trip. With zero workers, or
+    if the pool breaks, parsing falls back to running inline on the event loop.
+    """
+
+    def __init__(self, workers: int = None, batch_size: int = None, batch_delay: float = None):
+        self.workers = Config.PARSER_WORKERS if workers is None else workers
+        self.batch_size = batch_size or Config.PARSER_BATCH_SIZE
+        self.batch_delay = Config.PARSER_BATCH_DELAY if batch_delay is None else batch_delay
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pending: List[Tuple[str, tuple, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._batches: set[asyncio.Task] = set()
+
+    async def parse_listing(self, html: str, popular: bool = False) -> List[SongRef]:
+        return await self._submit("listing", (html, popular))
+
+    async def parse_views(self, html: str) -> int:
+        return await self._submit("views", (html,))
+
+    async def parse_song_page(self, html: str) -> SongPage:
+        return await self._submit("song", (html, Config.BASE_URL))
+
+    async def parse_chord_page(self, html: str) -> str:
+        return await self._submit("chord", (html, Config.BASE_URL))
+
+    async def _submit(self, kind: str, args: tuple):
+        with PARSE_DURATION.time(kind=kind):
+            if self.workers <= 0:
+                return PARSERS[kind](*args)
+
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._pending.append((kind, args, future))
+            if len(self._pending) >= self.batch_size:
+                self._flush()
+            elif self._flush_handle is None:
+                self._flush_handle = loop.call_later(self.batch_delay, self._flush)
+            return await future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run_batch(batch))
+            # Hold a reference so the batch task is not garbage collected mid-flight
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _run_batch(self, batch: List[Tuple[str, tuple, asyncio.Future]]):
+        jobs = [(kind, args) for kind, args, _ in batch]
+        try:
+            if self._pool is None:
+                # spawn avoids forking a process that already runs threads and an event loop
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            results = await asyncio.get_running_loop().run_in_executor(self._pool, parse_batch, jobs)
+        except BrokenProcessPool as e:
+            print(f"Parser pool broke ({e}), parsing on the event loop from now on")
+            self.close()
+            self.workers = 0
+            results = parse_batch(jobs)
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, _, future), (ok, value) in zip(batch, results):
+            if future.done():
+                continue
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(ValueError(value))
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
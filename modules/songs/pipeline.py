@@ -0,0 +1,267 @@
+import asyncio
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional, Tuple
+from core.config import Config
+from .models import Song
+from .parsing import EMPTY_SONG_PAGE, SongRef, song_page_complete
+from .chords import EAGER
+from .metrics import CrawlProgress
+from .journal import CrawlJournal
+
+if TYPE_CHECKING:
+    from .service import AsyncSongService
+
+OrderKey = Tuple[int, int]  # (listing page, position on page) keeps results in listing order
+
+# Return values of a ref selector
+TAKE = "take"  # crawl this ref
+SKIP = "skip"  # ignore this ref
+STOP = "stop"  # ignore this ref and stop walking listing pages
+
+# Outcomes of AsyncSongService.fetch_page_status
+FETCHED = "fetched"  # the page was read
+GONE = "gone"  # the site says it does not exist (404, 403): left out, not retried
+FAILED = "failed"  # timeout, connection error or 5xx: worth another try later
+
+
+class CrawlPipeline:
+    """Streaming crawl: listing pages -> song refs -> song pages -> chord pages
+
+    Every stage has its own worker pool and hands work to the next one through a
+    bounded queue, so a slow song page only holds up its own worker and memory is
+    bounded by the queue sizes instead of by the number of songs.
+
+    Chord images already in the service's chord memo are filled in directly; the
+    chord stage only fetches memo misses, and only when resolve_chords is set
+    (CHORD_MODE eager). Otherwise songs keep just their chord page URL.
+
+    With a journal, finished listing pages and songs are appended to it as they
+    complete, and work it already holds is taken from it instead of being fetched.
+
+    Songs whose page is gone are left out of the result. Songs whose fetch failed are
+    filled by fallback(href) when it knows them (e.g. the cached copy), else empty.
+    """
+
+    def __init__(
+        self,
+        service: "AsyncSongService",
+        listing_workers: int = None,
+        song_workers: int = None,
+        chord_workers: int = None,
+        queue_size: int = None,
+        popular: bool = False,
+        max_retries: int = 2,
+        progress: Optional[CrawlProgress] = None,
+        resolve_chords: bool = None,
+        journal: Optional[CrawlJournal] = None,
+        fallback: Optional[Callable[[str], Optional[Song]]] = None
+    ):
+        self.service = service
+        self.listing_workers = listing_workers or Config.CRAWL_LISTING_WORKERS
+        self.song_workers = song_workers or Config.CRAWL_SONG_WORKERS
+        self.chord_workers = chord_workers or Config.CRAWL_CHORD_WORKERS
+        self.queue_size = queue_size or Config.CRAWL_QUEUE_SIZE
+        self.popular = popular
+        self.max_retries = max_retries
+        self.progress = progress or CrawlProgress("adhoc", 0)
+        self.resolve_chords = Config.CHORD_MODE == EAGER if resolve_chords is None else resolve_chords
+        self.journal = journal
+        self.fallback = fallback
+
+        self._results: Dict[OrderKey, Tuple[str, Song]] = {}
+        self._seen: set[str] = set()
+        self._stopped = False
+
+    async def run(
+        self,
+        pages: Iterable[int],
+        select: Optional[Callable[[SongRef], str]] = None,
+        stop_on_empty_page: bool = False
+    ) -> List[Tuple[str, Song]]:
+        """Crawl the given listing pages and return (href, Song) pairs in listing order
+
+        select decides per ref whether to TAKE, SKIP or STOP; refs are offered in
+        listing order only when listing_workers is 1. stop_on_empty_page ends the
+        walk at the first listing page that yields no refs.
+        """
+        page_queue: asyncio.Queue = asyncio.Queue(self.listing_workers * 2)
+        ref_queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        chord_queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        progress = self.progress
+        progress.queues = {"pages": page_queue, "refs": ref_queue, "chords": chord_queue}
+
+        async def produce_pages():
+            for page_num in pages:
+                if self._stopped:
+                    break
+                await page_queue.put(page_num)
+
+        async def listing_worker():
+            while True:
+                page_num = await page_queue.get()
+                try:
+                    if self._stopped:
+                        continue
+                    journaled = self.journal.pages.get(page_num) if self.journal else None
+                    if journaled is not None:
+                        await self._resume_page(page_num, journaled, ref_queue)
+                        continue
+                    refs, outcome = await self.service.fetch_parsed_status(
+                        self.service.listing_url(page_num),
+                        "listing_popular" if self.popular else "listing",
+                        lambda html: self.service.parser.parse_listing(html, self.popular),
+                        self.max_retries,
+                        "listing"
+                    )
+                    # A gone listing page is as final as an empty one
+                    fetched = outcome != FAILED
+                    if not fetched:
+                        progress.pages_failed += 1
+                    refs = refs or []
+                    if not refs and stop_on_empty_page:
+                        print(f"Listing page {page_num} returned no songs, stopping")
+                        self._stopped = True
+                    taken = []
+                    for position, ref in enumerate(refs):
+                        if self._stopped or ref[0] in self._seen:
+                            continue
+                        decision = select(ref) if select else TAKE
+                        if decision == STOP:
+                            self._stopped = True
+                            break
+                        if decision == SKIP:
+                            continue
+                        self._seen.add(ref[0])
+                        taken.append((position, ref))
+                    # Journaled before its songs are queued, so a resume knows all of them
+                    if fetched and self.journal:
+                        self.journal.page_done(page_num, taken)
+                    for position, ref in taken:
+                        progress.refs_found += 1
+                        await ref_queue.put(((page_num, position), ref))
+                except Exception as e:
+                    progress.errors += 1
+                    progress.pages_failed += 1
+                    print(f"Error processing listing page {page_num}: {type(e).__name__}: {e}")
+                finally:
+                    progress.pages_done += 1
+                    page_queue.task_done()
+
+        # Song pages are read only up to the last field the parser needs
+        until = song_page_complete if Config.STREAM_SONG_PAGES else None
+
+        async def song_worker():
+            while True:
+                key, ref = await ref_queue.get()
+                try:
+                    href, song_name, singer_name = ref
+                    page, outcome = await self.service.fetch_parsed_status(
+                        self.service.absolute_url(href), "song", self.service.parser.parse_song_page, self.max_retries, "song", until
+                    ) if href.strip() else (None, FETCHED)
+                    if outcome == GONE:
+                        progress.songs_gone += 1
+                        if self.journal:
+                            self.journal.song_gone(key, href)
+                        continue
+                    if outcome == FAILED:
+                        progress.songs_failed += 1
+                        self._results[key] = (href, self._fallback_song(ref))
+                        progress.songs_done += 1
+                        continue
+                    lyrics, views, chord_url, song_transcriber = page or EMPTY_SONG_PAGE
+                    chord_image = self.service.chords.get(chord_url) if chord_url else ""
+                    song = Song(
+                        song=song_name,
+                        singer=singer_name,
+                        lyrics=lyrics,
+                        chord_image=chord_image or "",
+                        views=views,
+                        song_transcriber=song_transcriber,
+                        chord_url=chord_url
+                    )
+                    if chord_image is None and self.resolve_chords:
+                        await chord_queue.put((key, href, song))
+                    else:
+                        self._results[key] = (href, song)
+                        progress.songs_done += 1
+                        if page and self.journal:
+                            self.journal.song_done(key, href, song)
+                except Exception as e:
+                    progress.errors += 1
+                    progress.songs_failed += 1
+                    print(f"Error processing song '{ref[1]}': {type(e).__name__}: {e}")
+                    self._results[key] = (ref[0], self._fallback_song(ref))
+                    progress.songs_done += 1
+                finally:
+                    ref_queue.task_done()
+
+        async def chord_worker():
+            while True:
+                key, href, song = await chord_queue.get()
+                try:
+                    chord_image = await self.service.chords.resolve(song.chord_url, self.max_retries)
+                    if chord_image:
+                        song = song.model_copy(update={"chord_image": chord_image})
+                        # A failed chord fetch is not journaled, so a resume retries it
+                        if self.journal:
+                            self.journal.song_done(key, href, song)
+                except Exception as e:
+                    progress.errors += 1
+                    print(f"Error resolving chord for '{song.song}': {type(e).__name__}: {e}")
+                finally:
+                    self._results[key] = (href, song)
+                    progress.chords_done += 1
+                    progress.songs_done += 1
+                    chord_queue.task_done()
+
+        workers = [
+            *(asyncio.create_task(listing_worker()) for _ in range(self.listing_workers)),
+            *(asyncio.create_task(song_worker()) for _ in range(self.song_workers)),
+            *(asyncio.create_task(chord_worker()) for _ in range(self.chord_workers if self.resolve_chords else 0)),
+        ]
+        try:
+            # Each stage finishes its queue before the next one can be drained for good
+            await produce_pages()
+            await page_queue.join()
+            await ref_queue.join()
+            await chord_queue.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        return [self._results[key] for key in sorted(self._results)]
+
+    async def _resume_page(self, page_num: int, refs: List[Tuple[int, SongRef]], ref_queue: asyncio.Queue):
+        """Replay a journaled listing page: finished songs come from the journal, the rest are queued"""
+        progress = self.progress
+        for position, ref in refs:
+            if ref[0] in self._seen:
+                continue
+            self._seen.add(ref[0])
+            progress.refs_found += 1
+            key = (page_num, position)
+            if key in self.journal.gone:
+                progress.songs_gone += 1
+                continue
+            done = self.journal.songs.get(key)
+            if done is not None:
+                self._results[key] = done
+                progress.songs_done += 1
+            else:
+                await ref_queue.put((key, ref))
+
+    def _fallback_song(self, ref: SongRef) -> Song:
+        song = self.fallback(ref[0]) if self.fallback else None
+        return song if song is not None else self._empty_song(ref)
+
+    @staticmethod
+    def _empty_song(ref: SongRef) -> Song:
+        # Return song with empty data rather than dropping it
+        return Song(
+            song=ref[1],
+            singer=ref[2],
+            lyrics="",
+            chord_image="",
+            views=0,
+            song_transcriber=""
+        )
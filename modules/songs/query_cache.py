@@ -0,0 +1,93 @@
+from array import array
+from collections import OrderedDict
+from typing import Optional, Tuple
+from core.config import Config
+from .generation import SongGeneration
+from .metrics import QUERY_CACHE_ENTRIES, QUERY_CACHE_LOOKUPS
+
+# (song, singer, lyric, min_views, sort) after normalization
+QueryKey = Tuple[Optional[str], Optional[str], Optional[str], Optional[int], Optional[str]]
+
+
+class QueryCache:
+    """Bounded LRU of /songs search results per cache generation
+
+    Values are the matching row ids, so every page of a query is a slice of one
+    search, including cursor pages of a retained older generation. The first lookup
+    against a newer generation drops the entries of generations no longer retained
+    (GENERATION_RETENTION); lookups against those bypass the cache.
+    """
+
+    def __init__(self, max_entries: int = None, max_ids: int = None):
+        self.max_entries = Config.QUERY_CACHE_SIZE if max_entries is None else max_entries
+        self.max_ids = Config.QUERY_CACHE_MAX_IDS if max_ids is None else max_ids
+        self.generation: Optional[int] = None
+        self._results: OrderedDict[Tuple[int, QueryKey], array] = OrderedDict()
+        self._ids = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        QUERY_CACHE_ENTRIES.set_function(lambda: {(): len(self._results)})
+
+    @staticmethod
+    def key(song: str = None, singer: str = None, lyric: str = None, min_views: int = None, sort: str = None) -> QueryKey:
+        """Filters as the index sees them: terms lowercased, empty filters dropped"""
+        return (song.lower() if song else None,
+                singer.lower() if singer else None,
+                lyric.lower() if lyric else None,
+                min_views or None,
+                sort)
+
+    def search(
+        self,
+        generation: SongGeneration,
+        song: str = None,
+        singer: str = None,
+        lyric: str = None,
+        min_views: int = None,
+        sort: str = None
+    ) -> array:
+        """Matching row ids of generation, from the cache or a fresh index search"""
+        query = self.key(song, singer, lyric, min_views, sort)
+        if self.generation is None or generation.id > self.generation:
+            self.generation = generation.id
+            self._drop_before(generation.id - max(Config.GENERATION_RETENTION, 1) + 1)
+        elif generation.id <= self.generation - max(Config.GENERATION_RETENTION, 1):
+            # No longer retained: serve uncached rather than evict current results
+            return array('I', generation.index.search(*query))
+
+        key = (generation.id, query)
+        ids = self._results.get(key)
+        if ids is not None:
+            self._results.move_to_end(key)
+            self.hits += 1
+            QUERY_CACHE_LOOKUPS.inc(result="hit")
+            return ids
+
+        self.misses += 1
+        QUERY_CACHE_LOOKUPS.inc(result="miss")
+        ids = array('I', generation.index.search(*query))
+        if self.max_entries and len(ids) <= self.max_ids:
+            self._results[key] = ids
+            self._ids += len(ids)
+            while len(self._results) > self.max_entries or self._ids > self.max_ids:
+                _, evicted = self._results.popitem(last=False)
+                self._ids -= len(evicted)
+                self.evictions += 1
+        return ids
+
+    def _drop_before(self, generation_id: int):
+        for key in [key for key in self._results if key[0] < generation_id]:
+            self._ids -= len(self._results.pop(key))
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "generation": self.generation,
+            "entries": len(self._results),
+            "ids": self._ids,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+        }
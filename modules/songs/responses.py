@@ -0,0 +1,93 @@
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Iterable, List, Optional, Sequence, Tuple
+from fastapi import Response
+from core.config import Config
+from .generation import SongGeneration
+from .models import Song
+from .metrics import JSON_FRAGMENT_LOOKUPS
+
+
+class SongFragments:
+    """Song JSON bytes of the installed cache generation, serialized once per row
+
+    Rows are kept in a bounded LRU together with the chord image they were
+    serialized with, so a chord resolved later re-serializes only that row. Like
+    QueryCache, the first lookup against a newer generation drops every fragment.
+    """
+
+    def __init__(self, max_entries: int = None):
+        self.max_entries = Config.JSON_FRAGMENT_CACHE_SIZE if max_entries is None else max_entries
+        self.generation: Optional[int] = None
+        self._fragments: OrderedDict[int, Tuple[str, bytes]] = OrderedDict()
+
+    def page(self, generation: SongGeneration, ids: Sequence[int], chord_images: Sequence[str]) -> List[bytes]:
+        """JSON of each row in ids, with the chord image served for it"""
+        if self.generation != generation.id:
+            if self.generation is not None and generation.id < self.generation:
+                return [self._serialize(generation, i, image) for i, image in zip(ids, chord_images)]
+            self._fragments.clear()
+            self.generation = generation.id
+
+        fragments = []
+        for i, image in zip(ids, chord_images):
+            cached = self._fragments.get(i)
+            if cached is not None and cached[0] == image:
+                self._fragments.move_to_end(i)
+                JSON_FRAGMENT_LOOKUPS.inc(result="hit")
+                fragments.append(cached[1])
+                continue
+            JSON_FRAGMENT_LOOKUPS.inc(result="miss")
+            fragment = self._serialize(generation, i, image)
+            if self.max_entries:
+                self._fragments[i] = (image, fragment)
+                self._fragments.move_to_end(i)
+                if len(self._fragments) > self.max_entries:
+                    self._fragments.popitem(last=False)
+            fragments.append(fragment)
+        return fragments
+
+    @staticmethod
+    def _serialize(generation: SongGeneration, i: int, chord_image: str) -> bytes:
+        song = generation.songs.row(i)
+        if song.chord_image != chord_image:
+            song = song.model_copy(update={"chord_image": chord_image})
+        return song.model_dump_json().encode()
+
+
+def song_list_body(fragments: Iterable[bytes], count: int, is_next: bool, next_cursor: Optional[str] = None) -> bytes:
+    """SongListResponse JSON assembled from pre-serialized songs"""
+    return b'{"count":%d,"songs":[%s],"is_next":%s,"next_cursor":%s}' % (
+        count, b",".join(fragments), b"true" if is_next else b"false", json.dumps(next_cursor).encode()
+    )
+
+
+def songs_json(songs: Iterable[Song]) -> List[bytes]:
+    return [song.model_dump_json().encode() for song in songs]
+
+
+def make_etag(*parts) -> str:
+    """Strong ETag over the repr of parts"""
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check (weak comparison, as RFC 9110 requires for it)"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
+
+
+def json_response(body: bytes, etag: str) -> Response:
+    """Already serialized JSON body, sent as is"""
+    return Response(body, media_type="application/json", headers={"ETag": etag})
@@ -0,0 +1,160 @@
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+from core.config import Config
+
+if TYPE_CHECKING:
+    from .service import AsyncSongService
+
+# Crawl modes, also the values of the crawler endpoint's mode parameter
+FULL = "full"  # walk every listing page and rebuild the cache
+DISCOVERY = "incremental"  # first DISCOVERY_PAGES listing pages, new or renamed songs only
+VIEWS = "views"  # re-read view counts of cached songs
+CRAWL_MODES = (FULL, DISCOVERY, VIEWS)
+# When several jobs are due at once; a full crawl also counts as the other two
+PRIORITY = {FULL: 0, VIEWS: 1, DISCOVERY: 2}
+
+
+class CrawlScheduler:
+    """Runs discovery, view refresh and full crawls on their own time-based cadences
+
+    Each mode is due its interval (plus or minus CRAWL_JITTER of it) after its last
+    successful run, whoever started that run. Scheduled runs wait out CRAWL_QUIET_HOURS,
+    failed runs are retried after CRAWL_RETRY_INTERVAL, and followers in multi-worker
+    mode leave crawling to the leader. Manual triggers go through run_now, which shares
+    the service's single-flight crawl and reschedules afterwards.
+    """
+
+    def __init__(self, service: "AsyncSongService"):
+        self.service = service
+        self.intervals: Dict[str, float] = {
+            FULL: Config.FULL_CRAWL_INTERVAL,
+            DISCOVERY: Config.DISCOVERY_INTERVAL,
+            VIEWS: Config.VIEW_REFRESH_INTERVAL,
+        }
+        self._due: Dict[str, float] = {}
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._wake = asyncio.Event()
+            self.reschedule()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def reschedule(self, mode: str = None):
+        """Recompute when mode (or every mode) is due from its last successful run"""
+        for name in (mode,) if mode else CRAWL_MODES:
+            interval = self.intervals[name]
+            if not interval or interval <= 0:
+                self._due.pop(name, None)
+                continue
+            last = self.service.last_run(name)
+            if last is None:
+                self._due[name] = time.monotonic()
+            else:
+                jitter = interval * Config.CRAWL_JITTER * random.uniform(-1, 1)
+                self._due[name] = last + interval + jitter
+        if self._wake is not None:
+            self._wake.set()
+
+    def next_job(self) -> Optional[Tuple[str, float]]:
+        """(mode, monotonic due time) of the next job, or None if every cadence is disabled"""
+        if not self._due:
+            return None
+        mode = min(self._due, key=lambda name: (self._due[name], PRIORITY[name]))
+        due = self._due[mode]
+        # Prefer a higher-priority job that is already due as well
+        now = time.monotonic()
+        if due <= now:
+            mode = min((name for name, at in self._due.items() if at <= now), key=PRIORITY.__getitem__)
+        return mode, self._due[mode]
+
+    @staticmethod
+    def quiet_remaining(now: datetime = None) -> float:
+        """Seconds until CRAWL_QUIET_HOURS end, or 0 outside them"""
+        if not Config.CRAWL_QUIET_HOURS:
+            return 0.0
+        start, end = Config.CRAWL_QUIET_HOURS
+        now = now or datetime.now()
+        hour = now.hour + now.minute / 60 + now.second / 3600
+        quiet = start <= hour < end if start < end else hour >= start or hour < end
+        if not quiet:
+            return 0.0
+        # Counted from midnight, so a window may end at 24 (or 23.5, which is 23:30)
+        until = now.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(hours=end)
+        if until <= now:
+            until += timedelta(days=1)
+        return (until - now).total_seconds()
+
+    async def _sleep(self, seconds: float):
+        """Sleep, returning early when the schedule changes"""
+        self._wake.clear()
+        try:
+            await asyncio.wait_for(self._wake.wait(), seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _run(self):
+        while True:
+            job = self.next_job()
+            if job is None:
+                await self._sleep(3600)
+                continue
+            mode, due = job
+            delay = due - time.monotonic()
+            if delay > 0:
+                await self._sleep(delay)
+                continue
+            quiet = self.quiet_remaining()
+            if quiet:
+                print(f"Crawl schedule: {mode} is due but quiet hours last {quiet / 60:.0f} more minutes")
+                await self._sleep(quiet)
+                continue
+            if self.service.is_follower():
+                # The leader crawls; check again later in case this worker takes over
+                self._due[mode] = time.monotonic() + max(self.intervals[mode] / 10, Config.SHARED_POLL_INTERVAL)
+                continue
+            if self.service.is_crawling():
+                # Let the running crawl (manual or startup) finish, then see what is still due
+                await self.service.wait_for_crawl()
+                self.reschedule()
+                continue
+            await self._execute(mode)
+
+    async def _execute(self, mode: str):
+        print(f"Crawl schedule: starting {mode} crawl")
+        try:
+            await self.service.update_cache(mode=mode)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Scheduled {mode} crawl failed: {type(e).__name__}: {e}")
+        self.reschedule()
+        if self._due.get(mode, float("inf")) <= time.monotonic():
+            # Not recorded as run, so it failed: retry sooner than a full interval
+            self._due[mode] = time.monotonic() + min(self.intervals[mode], Config.CRAWL_RETRY_INTERVAL)
+
+    async def run_now(self, mode: str = DISCOVERY, max_retries: int = 2):
+        """Manual trigger: run mode now (ignoring quiet hours) and reschedule from it"""
+        try:
+            return await self.service.update_cache(max_retries, mode=mode)
+        finally:
+            if self._task is not None:
+                self.reschedule()
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        return {
+            "running": self._task is not None,
+            "quiet_for_seconds": round(self.quiet_remaining()),
+            "next_run_in_seconds": {mode: round(max(due - now, 0)) for mode, due in self._due.items()},
+        }
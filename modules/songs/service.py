@@ -1,21 +1,79 @@
 import asyncio
+import codecs
+from array import array
+from collections import OrderedDict
+import os
+import time
 import aiohttp
-from typing import List, Tuple
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 from core.config import Config
-from core.patterns import (
-    LYRICS_PATTERN, BR_PATTERN, NBSP_PATTERN, TAG_PATTERN,
-    CHORD_BUTTON_PATTERN, CHORD_IMG_PATTERN, SECTION_PATTERN,
-    COMMENT_SPLIT_PATTERN, A_TAG_PATTERN, HREF_PATTERN,
-    H3_PATTERN, H3_HEADER_PATTERN, WHITESPACE_PATTERN, 
-    HITSONG_SECTION_PATTERN, VIEW_PATTERN, AVATAR_PATTERN
-)
+from shared.limiter import AdaptiveLimiter, parse_retry_after
+from shared.retry import RetryPolicy
+from shared.http_cache import HttpCache, content_hash
 from .models import Song
+from .index import SongSearchIndex
+from .generation import SongGeneration
+from .singers import SingerIndex
+from .store import SongRows, SongStore
+from .parsing import ParserBackend, parse_listing, song_page_complete, views_complete
+from .pipeline import CrawlPipeline, TAKE, SKIP, STOP, FETCHED, GONE, FAILED
+from .journal import CrawlJournal
+from .chords import ChordResolver, BACKGROUND
+from .snapshot import SongSnapshot, write_snapshot
+from .cluster import SharedCache
+from .scheduler import CrawlScheduler, CRAWL_MODES, DISCOVERY, FULL, VIEWS
+from .metrics import (
+    FETCH_REQUESTS, FETCH_RETRIES, FETCH_BYTES, FETCH_BYTES_SAVED, FETCH_EARLY_STOPS, FETCH_DURATION,
+    RETRY_BUDGET_EXHAUSTED, CIRCUIT_OPEN, HTTP_CACHE_LOOKUPS, HTTP_CACHE_BYTES, PARSE_SKIPS,
+    CRAWLS, CRAWL_DURATION, CRAWL_SONGS, CACHE_SONGS, CACHE_GENERATION,
+    LIMITER_LIMIT, LIMITER_IN_FLIGHT, CrawlProgress
+)
 
 class AsyncSongService:
     def __init__(self):
-        self._songs_cache: List[Song] = []
-        self._singers: set[str] = set()
+        # Readers only ever see a fully built generation; crawls swap in a new one
+        self._current: SongGeneration = SongGeneration.empty()
+        # Recently replaced generations stay readable for cursors issued against them
+        self._generations: OrderedDict[int, SongGeneration] = OrderedDict({self._current.id: self._current})
+        self._crawl_task: Optional[asyncio.Task] = None
+        # Monotonic time of the last successful run per crawl mode (None = never)
+        self._last_run: Dict[str, Optional[float]] = dict.fromkeys(CRAWL_MODES)
+        self._popular_cache: Optional[List[Song]] = None
+        self._popular_refreshed_at: float = 0.0
+        self._popular_task: Optional[asyncio.Task] = None
         self._session: aiohttp.ClientSession = None
+        self.parser = ParserBackend()
+        self.chords = ChordResolver(self)
+        self.limiter = AdaptiveLimiter(
+            initial=Config.LIMITER_INITIAL,
+            minimum=Config.LIMITER_MIN,
+            maximum=Config.LIMITER_MAX,
+            decrease=Config.LIMITER_DECREASE,
+            latency_tolerance=Config.LIMITER_LATENCY_TOLERANCE
+        )
+        LIMITER_LIMIT.set_function(lambda: {(host,): state["limit"] for host, state in self.limiter.snapshot().items()})
+        LIMITER_IN_FLIGHT.set_function(lambda: {(host,): state["in_flight"] for host, state in self.limiter.snapshot().items()})
+        # One retry budget and circuit breaker for every fetch, so retries cannot pile up per caller
+        self.retry = RetryPolicy(
+            budget=Config.RETRY_BUDGET,
+            min_retries=Config.RETRY_MIN_PER_CRAWL,
+            base_delay=Config.RETRY_BASE_DELAY,
+            max_delay=Config.RETRY_MAX_DELAY,
+            error_rate=Config.BREAKER_ERROR_RATE,
+            window=Config.BREAKER_WINDOW,
+            min_requests=Config.BREAKER_MIN_REQUESTS,
+            cooldown=Config.BREAKER_COOLDOWN
+        )
+        CIRCUIT_OPEN.set_function(lambda: {(): float(self.retry.state != "closed")})
+        # Page bodies kept on disk between crawls and revalidated with conditional requests
+        self.http_cache: Optional[HttpCache] = None
+        if Config.HTTP_CACHE_DIR:
+            self.http_cache = HttpCache(Config.HTTP_CACHE_DIR, Config.HTTP_CACHE_MAX_BYTES, Config.HTTP_CACHE_TTL)
+            HTTP_CACHE_BYTES.set_function(lambda: {(): self.http_cache.total_bytes})
+        self._progress: Optional[CrawlProgress] = None
+        # Set in multi-worker mode (Config.SHARED_CACHE); followers never crawl
+        self.cluster: Optional[SharedCache] = None
+        self.scheduler = CrawlScheduler(self)
     
     async def __aenter__(self):
         # Initialize session on context entry
@@ -23,13 +81,62 @@ class AsyncSongService:
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self._session:
-            await self._session.close()
+        await self.close()
     
-    async def fetch_page(self, url: str, max_retries: int = 2) -> str:
-        """Async fetch page content with session validation, URL encoding, and retry logic"""
+    async def fetch_page(
+        self,
+        url: str,
+        max_retries: int = 2,
+        kind: str = "page",
+        until: Optional[Callable[[str], bool]] = None
+    ) -> str:
+        """Page content, or "" if it could not be fetched (see fetch_page_status)"""
+        text, _ = await self.fetch_page_status(url, max_retries, kind, until)
+        return text
+
+    async def fetch_page_status(
+        self,
+        url: str,
+        max_retries: int = 2,
+        kind: str = "page",
+        until: Optional[Callable[[str], bool]] = None
+    ) -> Tuple[str, str]:
+        """Async fetch page content with session validation, URL encoding, and retry logic
+
+        Returns (text, outcome): FETCHED with the page, GONE ("") when the site answered
+        that the page does not exist or is forbidden (404, 403), and FAILED ("") when it
+        could not be fetched this time (timeouts, connection errors, 5xx, retries used up).
+
+        kind (listing, song, chord, ...) only labels the fetch metrics. With until, the
+        body is streamed and reading stops as soon as until(text read so far) is true;
+        the rest of the page is never downloaded and the prefix is returned. Retries (at most
+        max_retries) are granted and spaced by the shared retry policy, whose circuit
+        breaker also holds every attempt back while the origin is failing.
+
+        Kinds with an HTTP_CACHE_TTL go through the on-disk HTTP cache: a body within
+        its TTL is returned without a request, an older one is revalidated with
+        If-None-Match / If-Modified-Since and reused on 304.
+        """
+        if self.is_follower():
+            # Only the leader worker talks to the site (and writes the shared HTTP cache)
+            print(f"Worker {os.getpid()} is a follower, not fetching {url}")
+            return "", FAILED
+        cache = self.http_cache if self.http_cache is not None and self.http_cache.cacheable(kind) else None
+        cached, cached_body = None, None
+        if cache is not None:
+            cached = cache.entry(url)
+            if cached is not None:
+                cached_body = await cache.read(cached)
+                if cached_body is None or (cached.partial and not (until and until(cached_body))):
+                    # Gone from disk, or a prefix too short for this caller: fetch the page whole
+                    cached, cached_body = None, None
+                elif cache.fresh(cached):
+                    HTTP_CACHE_LOOKUPS.inc(kind=kind, result="fresh")
+                    return cached_body, FETCHED
+        headers = cached.validators() if cached is not None else None
         
         for attempt in range(max_retries + 1):  # 0, 1, 2 (3 total attempts)
+            started = time.perf_counter()
             try:
                 # Ensure session exists
                 if not self._session or self._session.closed:
@@ -55,80 +162,176 @@ class AsyncSongService:
                         parsed.fragment
                     ))
                 
-                async with self._session.get(url) as response:
+                # The adaptive limiter decides how many requests this host gets in flight
+                async with self.retry.attempt() as outcome, self.limiter.slot(url) as slot, \
+                        self._session.get(url, headers=headers) as response:
+                    slot.status = response.status
+                    outcome.failed = response.status >= 500 or response.status == 429
+                    if response.status in (429, 503):
+                        slot.retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                    self._record_fetch(kind, str(response.status), started)
+                    
                     # Handle different response status codes
-                    if response.status == 404:
+                    if response.status == 304 and cached is not None:
+                        cache.revalidated(cached)
+                        HTTP_CACHE_LOOKUPS.inc(kind=kind, result="not_modified")
+                        return cached_body, FETCHED
+                    elif response.status == 404:
                         print(f"Page not found (404): {url}")
-                        return ""
+                        return "", GONE
                     elif response.status == 403:
                         print(f"Access forbidden (403): {url}")
-                        return ""
+                        return "", GONE
                     elif response.status == 500:
                         print(f"Server error (500): {url}")
-                        return ""
+                        return "", FAILED
                     
                     response.raise_for_status()
                     
-                    # Try different encoding methods
-                    try:
-                        # First try UTF-8
-                        return await response.text(encoding='utf-8')
-                    except UnicodeDecodeError:
-                        # Fallback to auto-detection
-                        text = await response.text()
-                        return text
+                    partial = False
+                    if until is not None:
+                        text, partial = await self._read_until(response, until, kind)
+                    else:
+                        body = await response.read()
+                        FETCH_BYTES.inc(len(body), kind=kind)
+                        
+                        # Try different encoding methods
+                        try:
+                            # First try UTF-8
+                            text = body.decode('utf-8')
+                        except UnicodeDecodeError:
+                            # Fallback to auto-detection
+                            text = await response.text()
+                    
+                    if cache is not None and text:
+                        changed = await cache.store(
+                            url, kind, text, response.headers.get('ETag'), response.headers.get('Last-Modified'), partial
+                        )
+                        result = "miss" if cached is None else ("changed" if changed else "unchanged")
+                        HTTP_CACHE_LOOKUPS.inc(kind=kind, result=result)
+                    return text, FETCHED
                         
             except asyncio.TimeoutError:
-                if attempt < max_retries:
-                    if attempt == 0:
-                        # First retry: instant
-                        print(f"Timeout fetching {url} (attempt {attempt + 1}/{max_retries + 1}), retrying instantly...")
-                    else:
-                        # Subsequent retries: progressive backoff
-                        wait_time = attempt * 2  # 0s, 2s, 4s...
-                        print(f"Timeout fetching {url} (attempt {attempt + 1}/{max_retries + 1}), retrying in {wait_time}s...")
-                        await asyncio.sleep(wait_time)
-                    continue
-                else:
-                    print(f"Final timeout fetching {url} after {max_retries + 1} attempts")
-                    return ""
+                self._record_fetch(kind, "timeout", started)
+                error = "Timeout"
             except aiohttp.ClientError as e:
-                if attempt < max_retries:
-                    if attempt == 0:
-                        # First retry: instant
-                        print(f"Client error fetching {url} (attempt {attempt + 1}/{max_retries + 1}): {e}, retrying instantly...")
-                    else:
-                        # Subsequent retries: progressive backoff
-                        wait_time = attempt * 2  # 0s, 2s, 4s...
-                        print(f"Client error fetching {url} (attempt {attempt + 1}/{max_retries + 1}): {e}, retrying in {wait_time}s...")
-                        await asyncio.sleep(wait_time)
-                    continue
-                else:
-                    print(f"Final client error fetching {url} after {max_retries + 1} attempts: {e}")
-                    return ""
+                if not isinstance(e, aiohttp.ClientResponseError):
+                    self._record_fetch(kind, "error", started)
+                error = f"Client error ({e})"
             except Exception as e:
-                if attempt < max_retries:
-                    if attempt == 0:
-                        # First retry: instant
-                        print(f"Unexpected error fetching {url} (attempt {attempt + 1}/{max_retries + 1}): {type(e).__name__}: {e}, retrying instantly...")
-                    else:
-                        # Subsequent retries: progressive backoff
-                        wait_time = attempt * 2  # 0s, 2s, 4s...
-                        print(f"Unexpected error fetching {url} (attempt {attempt + 1}/{max_retries + 1}): {type(e).__name__}: {e}, retrying in {wait_time}s...")
-                        await asyncio.sleep(wait_time)
-                    continue
-                else:
-                    print(f"Final unexpected error fetching {url} after {max_retries + 1} attempts: {type(e).__name__}: {e}")
-                    return ""
+                self._record_fetch(kind, "error", started)
+                error = f"Unexpected error ({type(e).__name__}: {e})"
+
+            if attempt == max_retries:
+                print(f"{error} fetching {url}, giving up after {max_retries + 1} attempts")
+                return "", FAILED
+            if not self.retry.allow_retry():
+                print(f"{error} fetching {url}, retry budget exhausted")
+                RETRY_BUDGET_EXHAUSTED.inc(kind=kind)
+                return "", FAILED
+            FETCH_RETRIES.inc(kind=kind)
+            wait_time = self.retry.backoff(attempt)
+            print(f"{error} fetching {url} (attempt {attempt + 1}/{max_retries + 1}), retrying in {wait_time:.1f}s...")
+            await asyncio.sleep(wait_time)
         
-        return ""  # Should never reach here, but just in case
+        return "", FAILED  # Should never reach here, but just in case
+
+    async def _read_until(self, response: aiohttp.ClientResponse, until: Callable[[str], bool], kind: str) -> Tuple[str, bool]:
+        """Stream a body through an incremental UTF-8 decoder until until(text so far) holds
+
+        Returns the text and whether reading stopped before the end of the body.
+
+        Stopping early closes the connection, since the unread rest of the body cannot
+        be skipped on a keep-alive connection. Bytes saved are only known when the body
+        is not transfer-compressed and has a Content-Length.
+        """
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        chunks = []
+        text = ""
+        read = 0
+        async for chunk in response.content.iter_chunked(Config.STREAM_CHUNK_SIZE):
+            read += len(chunk)
+            chunks.append(chunk)
+            if decoder is None:
+                continue
+            try:
+                text += decoder.decode(chunk)
+            except UnicodeDecodeError:
+                # Not UTF-8: read the whole page and decode it below
+                decoder = None
+                continue
+            if until(text):
+                FETCH_BYTES.inc(read, kind=kind)
+                FETCH_EARLY_STOPS.inc(kind=kind)
+                if response.content_length and not response.headers.get('Content-Encoding'):
+                    saved = max(0, response.content_length - read)
+                    FETCH_BYTES_SAVED.inc(saved, kind=kind)
+                    if self._progress and self._progress.finished_at is None:
+                        self._progress.bytes_saved += saved
+                response.close()
+                return text, True
+
+        FETCH_BYTES.inc(read, kind=kind)
+        if decoder is None:
+            return b"".join(chunks).decode(response.charset or 'utf-8', errors='replace'), False
+        return text + decoder.decode(b"", final=True), False
+
+    async def fetch_parsed(
+        self,
+        url: str,
+        parse_as: str,
+        parse: Callable[[str], Awaitable[Any]],
+        max_retries: int = 2,
+        kind: str = "page",
+        until: Optional[Callable[[str], bool]] = None
+    ) -> Any:
+        """fetch_page, then parse(html); None if the fetch failed (see fetch_parsed_status)"""
+        result, _ = await self.fetch_parsed_status(url, parse_as, parse, max_retries, kind, until)
+        return result
+
+    async def fetch_parsed_status(
+        self,
+        url: str,
+        parse_as: str,
+        parse: Callable[[str], Awaitable[Any]],
+        max_retries: int = 2,
+        kind: str = "page",
+        until: Optional[Callable[[str], bool]] = None
+    ) -> Tuple[Any, str]:
+        """(parse(html), outcome of fetch_page_status); the result is None without a page
+
+        When the page is in the HTTP cache and its body hash matches the one a result
+        was stored for under parse_as, that result is returned instead of parsing again.
+        parse_as names the parse, since one page can be parsed in several ways.
+        """
+        html, outcome = await self.fetch_page_status(url, max_retries, kind, until)
+        if not html:
+            return None, outcome
+        cache = self.http_cache
+        entry = cache.entry(url) if cache is not None and cache.cacheable(kind) else None
+        digest = content_hash(html) if entry is not None else None
+        if entry is None or entry.hash != digest:
+            return await parse(html), outcome
+        found, result = await cache.read_parsed(entry, parse_as)
+        if found:
+            PARSE_SKIPS.inc(kind=parse_as)
+            return result, outcome
+        result = await parse(html)
+        await cache.store_parsed(entry, parse_as, digest, result)
+        return result, outcome
+
+    @staticmethod
+    def _record_fetch(kind: str, status: str, started: float):
+        FETCH_REQUESTS.inc(kind=kind, status=status)
+        FETCH_DURATION.observe(time.perf_counter() - started, kind=kind)
     
     async def _init_session(self):
         """Initialize session if not exists"""
         if not self._session or self._session.closed:
+            # Per-host concurrency is governed by self.limiter; the pool just has to fit it
             connector = aiohttp.TCPConnector(
-                limit=100,
-                limit_per_host=20,
+                limit=Config.HTTP_MAX_CONNECTIONS,
+                limit_per_host=Config.LIMITER_MAX,
                 ttl_dns_cache=300,
                 use_dns_cache=True,
                 keepalive_timeout=45,  # Keep connections alive
@@ -159,254 +362,557 @@ class AsyncSongService:
     async def fetch_lyrics(self, song_url: str, request_semaphore: asyncio.Semaphore = None, max_retries: int = 2) -> Tuple[str, int, str, str]:
         """Extract lyrics and chord image URL from song page - with optional semaphore control and retry logic"""
         
-        async def controlled_fetch(url, retries=max_retries):
+        until = song_page_complete if Config.STREAM_SONG_PAGES else None
+
+        async def controlled_fetch(url, retries=max_retries, kind="song"):
             if request_semaphore:
                 async with request_semaphore:
-                    return await self.fetch_page(url, retries)
-            return await self.fetch_page(url, retries)
+                    return await self.fetch_parsed(url, "song", self.parser.parse_song_page, retries, kind, until)
+            return await self.fetch_parsed(url, "song", self.parser.parse_song_page, retries, kind, until)
         
         # Clean and validate the song URL
         if not song_url or not song_url.strip():
             return "", 0, "", ""
             
-        # Handle relative URLs
-        if song_url.startswith('/'):
-            full_url = Config.BASE_URL + song_url
-        elif song_url.startswith('http'):
-            full_url = song_url
-        else:
-            full_url = Config.BASE_URL + '/' + song_url
-            
-        html = await controlled_fetch(full_url, max_retries)
+        full_url = self.absolute_url(song_url)
+        page = await controlled_fetch(full_url, max_retries)
         
-        if not html:
+        if page is None:
             return "", 0, "", ""
 
-        views = 0
-        view_match = VIEW_PATTERN.search(html)
-        if view_match:
-            try:
-                views = int(view_match.group(1))
-            except (ValueError, TypeError):
-                views = 0
-
-        song_transcriber = "" 
-        song_transcriber_match = AVATAR_PATTERN.search(html)
-        if song_transcriber_match:
-            song_transcriber = Config.BASE_URL + song_transcriber_match.group(1)
-
-        # Extract lyrics using pre-compiled patterns
-        lyrics_match = LYRICS_PATTERN.search(html)
-        lyrics = ""
-        if lyrics_match:
-            lyrics = lyrics_match.group(1)
-            lyrics = BR_PATTERN.sub('\n', lyrics)
-            lyrics = NBSP_PATTERN.sub(' ', lyrics)
-            lyrics = TAG_PATTERN.sub('', lyrics).strip()
+        lyrics, views, chord_url, song_transcriber = page
         
-        # Extract chord image URL with additional request control and retry
+        # Chord pages rarely change, so the image comes from the chord memo when it can
         chord_image_url = ""
-        chord_match = CHORD_BUTTON_PATTERN.search(html)
-        if chord_match:
-            chord_url = Config.BASE_URL + chord_match.group(1)
-            chord_html = await controlled_fetch(chord_url, max_retries)
-            if chord_html:
-                img_match = CHORD_IMG_PATTERN.search(chord_html)
-                if img_match:
-                    chord_image_url = Config.BASE_URL + img_match.group(1)
+        if chord_url:
+            chord_image_url = await self.chords.resolve(chord_url, max_retries)
         
         return lyrics, views, chord_image_url, song_transcriber
     
+    @staticmethod
+    def absolute_url(song_url: str) -> str:
+        """Resolve a listing href against BASE_URL"""
+        if song_url.startswith('/'):
+            return Config.BASE_URL + song_url
+        elif song_url.startswith('http'):
+            return song_url
+        return Config.BASE_URL + '/' + song_url
+
+    async def fetch_views(self, song_url: str, max_retries: int = 2) -> Optional[int]:
+        """Fetch only the view count of a song page (None if the page could not be fetched)"""
+        if not song_url or not song_url.strip():
+            return None
+        # Only the view count label is needed, and it sits near the top of the page
+        until = views_complete if Config.STREAM_SONG_PAGES else None
+        return await self.fetch_parsed(self.absolute_url(song_url), "views", self.parser.parse_views, max_retries, "song", until)
+
     def extract_songs(self, html: str, popular: bool = False) -> List[Tuple[str, str, str]]:
-        """Extract song data from page HTML (kept synchronous as it's CPU-bound)"""
-        section_match = SECTION_PATTERN.search(html)
-        if not section_match:
-            return []
-        
-        section_html = section_match.group(1)
-        a_tags = None
-        if popular:
-            section_b = COMMENT_SPLIT_PATTERN.split(section_html, maxsplit=1)[1]
-            hit_section_match = HITSONG_SECTION_PATTERN.search(section_b)
-            if not hit_section_match:
-                return []
-            hit_section_html = hit_section_match.group(1)
-            a_tags = A_TAG_PATTERN.findall(hit_section_html)
-        else:
-            section_hit_update = COMMENT_SPLIT_PATTERN.split(section_html, maxsplit=1)[0]
-            a_tags = A_TAG_PATTERN.findall(section_hit_update)
-        
-        songs = []
-        for a_tag in a_tags:
-            href_match = HREF_PATTERN.search(a_tag)
-            href = href_match.group(1) if href_match else ''
-            
-            h3_match = H3_PATTERN.search(a_tag) or H3_HEADER_PATTERN.search(a_tag)
-            if h3_match:
-                h3_text = WHITESPACE_PATTERN.sub(' ', h3_match.group(1)).strip()
-                if ' - ' in h3_text:
-                    song_name, singer_name = h3_text.split(' - ', 1)
-                else:
-                    song_name, singer_name = h3_text, ''
-                songs.append((href, song_name.strip(), singer_name.strip()))
-                self._singers.add(singer_name.strip())
-        return songs
+        """Extract song data from page HTML on the calling thread (the crawl uses self.parser)"""
+        return parse_listing(html, popular)
     
     async def process_song_data(self, song_data: Tuple[str, str, str], request_semaphore: asyncio.Semaphore = None, max_retries: int = 2) -> Song:
-        """Process a single song's data - async version with semaphore support and retry logic"""
+        """Process a single song's data - async version with semaphore support"""
         link, song_name, singer_name = song_data
         
-        # Retry logic for the entire song processing
-        for attempt in range(max_retries + 1):
-            try:
-                lyrics, views, chord_image, song_transcriber = await self.fetch_lyrics(link, request_semaphore, max_retries)
-                return Song(
-                    song=song_name, 
-                    singer=singer_name, 
-                    lyrics=lyrics, 
-                    chord_image=chord_image, 
-                    views=views,
-                    song_transcriber=song_transcriber
-                )
-            except asyncio.TimeoutError:
-                if attempt < max_retries:
-                    if attempt == 0:
-                        # First retry: instant
-                        print(f"Timeout processing song '{song_name}' (attempt {attempt + 1}/{max_retries + 1}), retrying instantly...")
-                    else:
-                        # Subsequent retries: progressive backoff
-                        wait_time = attempt * 3  # 0s, 3s, 6s...
-                        print(f"Timeout processing song '{song_name}' (attempt {attempt + 1}/{max_retries + 1}), retrying in {wait_time}s...")
-                        await asyncio.sleep(wait_time)
-                    continue
-                else:
-                    print(f"Final timeout processing song '{song_name}' after {max_retries + 1} attempts")
-                    # Return song with empty data rather than None
-                    return Song(
-                        song=song_name, 
-                        singer=singer_name, 
-                        lyrics="", 
-                        chord_image="", 
-                        views=0,
-                        song_transcriber=""
-                    )
-            except Exception as e:
-                if attempt < max_retries:
-                    if attempt == 0:
-                        # First retry: instant
-                        print(f"Error processing song '{song_name}' (attempt {attempt + 1}/{max_retries + 1}): {e}, retrying instantly...")
-                    else:
-                        # Subsequent retries: progressive backoff
-                        wait_time = attempt * 3  # 0s, 3s, 6s...
-                        print(f"Error processing song '{song_name}' (attempt {attempt + 1}/{max_retries + 1}): {e}, retrying in {wait_time}s...")
-                        await asyncio.sleep(wait_time)
-                    continue
-                else:
-                    print(f"Final error processing song '{song_name}' after {max_retries + 1} attempts: {e}")
-                    # Return song with empty data rather than None
-                    return Song(
-                        song=song_name, 
-                        singer=singer_name, 
-                        lyrics="", 
-                        chord_image="", 
-                        views=0,
-                        song_transcriber=""
-                    )
+        # fetch_page retries under the shared retry policy; retrying the whole song again would multiply requests
+        try:
+            lyrics, views, chord_image, song_transcriber = await self.fetch_lyrics(link, request_semaphore, max_retries)
+        except Exception as e:
+            print(f"Error processing song '{song_name}': {type(e).__name__}: {e}")
+            # Return song with empty data rather than None
+            lyrics, views, chord_image, song_transcriber = "", 0, "", ""
+        return Song(
+            song=song_name, 
+            singer=singer_name, 
+            lyrics=lyrics, 
+            chord_image=chord_image, 
+            views=views,
+            song_transcriber=song_transcriber
+        )
     
+    @staticmethod
+    def listing_url(page_num: int) -> str:
+        return f"{Config.BASE_URL}/lyric/page{page_num}"
+
     async def get_songs_list(
         self,
         page: int = 1, 
-        page_concurrency: int = 10,  # Concurrent page fetches
-        song_concurrency: int = 100,  # Concurrent song processing
+        page_concurrency: int = None,  # Listing page workers
+        song_concurrency: int = None,  # Song page workers
         popular: bool = False,
         max_retries: int = 2  # Maximum retries for failed operations
     ) -> List[Song]:
-        """Get list of songs with dual-level semaphore control and retry logic"""
-        all_song_data = []
-        
-        # Semaphore for page fetching
-        page_semaphore = asyncio.Semaphore(page_concurrency)
-        
-        async def fetch_page_bounded(page_num):
-            async with page_semaphore:
-                return await self.fetch_page(f"{Config.BASE_URL}/lyric/page{page_num}", max_retries)
-        
-        # Fetch pages with controlled concurrency
-        page_tasks = [fetch_page_bounded(i) for i in range(1, page + 1)]
-        pages_html = await asyncio.gather(*page_tasks, return_exceptions=True)
-        
-        # Extract song data from all pages
-        for html in pages_html:
-            if isinstance(html, str) and html:
-                all_song_data.extend(self.extract_songs(html, popular))
-        
-        print(f"Found {len(all_song_data)} songs to process")
+        """Get list of songs from listing pages 1..page through the streaming crawl pipeline"""
+        pairs = await self.crawl_pages(page, page_concurrency, song_concurrency, popular, max_retries)
+        return [song for _, song in pairs]
+
+    async def crawl_pages(
+        self,
+        page: int = 1,
+        page_concurrency: int = None,
+        song_concurrency: int = None,
+        popular: bool = False,
+        max_retries: int = 2,
+        progress: CrawlProgress = None,
+        journal: CrawlJournal = None,
+        fallback: Callable[[str], Optional[Song]] = None
+    ) -> List[Tuple[str, Song]]:
+        """Crawl listing pages 1..page and return (href, Song) pairs in listing order (see CrawlPipeline)"""
+        pipeline = CrawlPipeline(
+            self,
+            listing_workers=page_concurrency,
+            song_workers=song_concurrency,
+            popular=popular,
+            max_retries=max_retries,
+            progress=progress,
+            journal=journal,
+            fallback=fallback
+        )
+        pairs = await pipeline.run(range(1, page + 1))
+        print(f"Crawled {len(pairs)} songs from {page} listing pages")
+        return pairs
+
+    async def crawl_new_songs(
+        self,
+        known: dict[str, Tuple[str, str]],
+        max_pages: int = None,
+        stop_after_known: int = None,
+        max_retries: int = 2,
+        progress: CrawlProgress = None
+    ) -> List[Tuple[str, Song]]:
+        """Walk listing pages newest-first and crawl refs that are new or whose title changed
+
+        Stops once a run of stop_after_known consecutive already-known hrefs has been seen.
+        """
+        max_pages = max_pages or Config.LISTING_PAGES
+        stop_after_known = stop_after_known or Config.INCREMENTAL_KNOWN_RUN
+        known_run = 0
         
-        # Process songs with controlled concurrency
-        songs_list = []
-        song_semaphore = asyncio.Semaphore(song_concurrency)
+        def select(ref):
+            nonlocal known_run
+            href, song_name, singer_name = ref
+            if known.get(href) == (song_name, singer_name):
+                known_run += 1
+                return STOP if known_run >= stop_after_known else SKIP
+            known_run = 0
+            return TAKE
         
-        async def bounded_song_process(song_data):
-            async with song_semaphore:
-                try:
-                    # Create a request-level semaphore for HTTP calls within each song
-                    request_semaphore = asyncio.Semaphore(2)  # Max 2 HTTP requests per song concurrently
-                    return await self.process_song_data(song_data, request_semaphore, max_retries)
-                except Exception as e:
-                    print(f"Unexpected error in bounded_song_process for {song_data[1]}: {e}")
-                    # Return song with empty data rather than None
-                    return Song(
-                        song=song_data[1], 
-                        singer=song_data[2], 
-                        lyrics="", 
-                        chord_image="", 
-                        views=0
-                    )
+        # A single listing worker keeps refs in page order so the known-run is meaningful;
+        # song and chord pages for the new refs are still fetched concurrently
+        pipeline = CrawlPipeline(self, listing_workers=1, max_retries=max_retries, progress=progress)
+        return await pipeline.run(range(1, max_pages + 1), select, stop_on_empty_page=True)
+
+    async def refresh_views(self, song_concurrency: int = 100, max_retries: int = 2) -> int:
+        """Re-read view counts for every cached song without touching chord pages"""
+        current = self._current
+        store, hrefs = current.songs, current.hrefs
+        semaphore = asyncio.Semaphore(song_concurrency)
         
-        # Process songs in batches for better memory management
-        batch_size = 250  # Process in batches to avoid memory issues
+        async def bounded_views(href):
+            async with semaphore:
+                return await self.fetch_views(href, max_retries)
         
-        for i in range(0, len(all_song_data), batch_size):
-            batch = all_song_data[i:i + batch_size]
-            print(f"Processing batch {i//batch_size + 1}/{(len(all_song_data)-1)//batch_size + 1}")
-            
-            song_tasks = [bounded_song_process(song_data) for song_data in batch]
-            batch_results = await asyncio.gather(*song_tasks, return_exceptions=True)
-            
-            # Filter successful results
-            for result in batch_results:
-                if isinstance(result, Song):
-                    songs_list.append(result)
-                elif isinstance(result, Exception):
-                    print(f"Exception in batch result: {result}")
-                elif result is not None:
-                    print(f"Unexpected result type: {type(result)}")
+        results = await asyncio.gather(*(bounded_views(href) for href in hrefs), return_exceptions=True)
+        views_by_href = {
+            href: views for href, views in zip(hrefs, results)
+            if isinstance(views, int) and not isinstance(views, bool)
+        }
         
-        return songs_list
+        # Only apply counts if the cache was not replaced while we were fetching
+        if self._current is not current:
+            return 0
+        views = array('q', store.views)
+        changed = 0
+        for i, href in enumerate(hrefs):
+            count = views_by_href.get(href)
+            if count is not None and count != views[i]:
+                views[i] = count
+                changed += 1
+        self._record_run(VIEWS)
+        if changed:
+            # Titles and lyrics are unchanged, so every other column and the n-gram index are reused
+            await self._install_store(store.with_views(views), current.index.with_views(views), singers=current.singers)
+        return changed
     
     async def initialize(self):
         """Initialize session manually (alternative to context manager)"""
         await self._init_session()
     
     async def close(self):
-        """Close session manually"""
+        """Close session, chord workers and parser workers manually"""
+        await self.chords.close()
+        if self.http_cache is not None and not self.is_follower():
+            self.http_cache.save()
+        self.parser.close()
         if self._session:
             await self._session.close()
             self._session = None
 
-    async def update_cache(self, max_retries: int = 2):
-        """Update cache with all songs - with retry support"""
+    async def update_cache(self, max_retries: int = 2, full: bool = False, mode: str = None):
+        """Update cache with new songs, or recrawl every listing page when full=True
+
+        mode (see scheduler.CRAWL_MODES) overrides full. Only one crawl runs at a time;
+        callers arriving while one is running join it.
+        """
+        return await asyncio.shield(self.trigger_crawl(max_retries, full, mode))
+
+    def trigger_crawl(self, max_retries: int = 2, full: bool = False, mode: str = None) -> asyncio.Task:
+        """Start a crawl in the background unless one is already running (single-flight)"""
+        mode = mode or (FULL if full else DISCOVERY)
+        if mode not in CRAWL_MODES:
+            raise ValueError(f"crawl mode must be one of {CRAWL_MODES}, got {mode!r}")
+        if self._crawl_task is None or self._crawl_task.done():
+            self._crawl_task = asyncio.create_task(self._run_crawl(max_retries, mode))
+            # Background triggers never await the task, so consume its exception here
+            self._crawl_task.add_done_callback(lambda task: task.cancelled() or task.exception())
+        elif self._progress is not None and self._progress.mode != mode:
+            print(f"A {self._progress.mode} crawl is already running, joining it instead of starting a {mode} crawl")
+        return self._crawl_task
+
+    def is_crawling(self) -> bool:
+        return self._crawl_task is not None and not self._crawl_task.done()
+
+    async def wait_for_crawl(self):
+        """Wait until the running crawl (if any) ends, whatever its outcome"""
+        if self.is_crawling():
+            await asyncio.wait([self._crawl_task])
+
+    def last_run(self, mode: str) -> Optional[float]:
+        """Monotonic time the last successful crawl of mode finished, or None"""
+        return self._last_run[mode]
+
+    def is_follower(self) -> bool:
+        """True in multi-worker mode when another worker is the crawl leader"""
+        return self.cluster is not None and not self.cluster.is_leader
+
+    def crawl_status(self) -> dict:
+        """Progress of the running crawl (or the last finished one) plus cache and limiter state"""
+        return {
+            "crawling": self.is_crawling(),
+            "generation": self._current.id,
+            "songs": len(self._current),
+            "crawl": self._progress.to_dict() if self._progress else None,
+            "chords": self.chords.stats(),
+            "limiter": self.limiter.snapshot(),
+            "retry": self.retry.snapshot(),
+            "http_cache": self.http_cache.stats() if self.http_cache is not None else None,
+            "cluster": self.cluster.stats() if self.cluster else None,
+            "schedule": self.scheduler.stats(),
+        }
+
+    async def _run_crawl(self, max_retries: int, mode: str):
+        if self.is_follower():
+            # The leader worker crawls; its generations arrive through the shared snapshot
+            return {"message": f"worker {os.getpid()} is a follower, the leader worker crawls"}
+
         # Ensure session is initialized
         if not self._session or self._session.closed:
             await self._init_session()
-            
-        self._songs_cache.clear()
-        self._singers.clear()
-        self._songs_cache = await self.get_songs_list(253, max_retries=max_retries)
-        return {"message": f"found {len(self._songs_cache)} songs"}
+        
+        if not self._current.hrefs:
+            # Nothing cached yet: discovery or a views refresh would have nothing to build on
+            mode = FULL
+        pages = {FULL: Config.LISTING_PAGES, DISCOVERY: Config.DISCOVERY_PAGES, VIEWS: 0}[mode]
+        progress = self._progress = CrawlProgress(mode, pages)
+        self.retry.reset_budget()
+        outcome = "failed"
+        try:
+            if mode == FULL:
+                result = await self._full_crawl(max_retries)
+            elif mode == VIEWS:
+                changed = await self.refresh_views(max_retries=max_retries)
+                result = {"message": f"updated view counts of {changed} songs"}
+            else:
+                result = await self._incremental_crawl(max_retries)
+            outcome = "ok"
+            return result
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            raise
+        except Exception as e:
+            print(f"Crawl failed, keeping generation {self._current.id}: {type(e).__name__}: {e}")
+            raise
+        finally:
+            progress.finish(outcome)
+            CRAWLS.inc(mode=mode, outcome=outcome)
+            CRAWL_DURATION.observe(progress.finished_at - progress.started_at, mode=mode)
+            CRAWL_SONGS.inc(progress.songs_done, mode=mode)
+
+    async def _full_crawl(self, max_retries: int = 2):
+        # The current generation keeps serving until the new one is complete
+        journal = None
+        if Config.CRAWL_JOURNAL_PATH:
+            # Picks up where an interrupted full crawl stopped
+            journal = await asyncio.to_thread(CrawlJournal.open, Config.CRAWL_JOURNAL_PATH, FULL, Config.LISTING_PAGES)
+        try:
+            progress = self._progress
+            pairs = await self.crawl_pages(
+                Config.LISTING_PAGES, max_retries=max_retries, progress=progress, journal=journal,
+                fallback=self._cached_song_lookup()
+            )
+            self._check_full_crawl(pairs, progress, journal)
+            # Recorded before the install so the snapshot it writes carries the new run times
+            self._record_run(FULL)
+            await self._install(pairs)
+        finally:
+            if journal:
+                journal.close()
+        if journal:
+            journal.discard()
+        return {"message": f"found {len(pairs)} songs, {progress.songs_gone} song pages gone"}
+
+    def _check_full_crawl(self, pairs: List[Tuple[str, Song]], progress: CrawlProgress, journal: Optional[CrawlJournal]):
+        """Raise instead of installing a full crawl that is missing listing pages, songs or most of the cache
+
+        Failed songs only block the install while the journal can still resume them, and
+        only until it was resumed CRAWL_JOURNAL_MAX_RESUMES times; after that they keep
+        their cached copy. Songs whose page is gone never block it.
+        """
+        failed = progress.pages_failed or (journal is not None and progress.songs_failed)
+        if failed and journal is not None and journal.resumes >= Config.CRAWL_JOURNAL_MAX_RESUMES:
+            print(
+                f"Installing full crawl after {journal.resumes} resumes despite {progress.pages_failed} failed "
+                f"listing pages and {progress.songs_failed} failed songs"
+            )
+        elif progress.pages_failed:
+            raise RuntimeError(f"{progress.pages_failed} of {progress.pages_total} listing pages could not be fetched")
+        elif failed:
+            # Installing now would drop the journal, and with it the only record of what is missing
+            raise RuntimeError(f"{progress.songs_failed} songs could not be fetched, the next full crawl resumes them")
+        cached = len(self._current)
+        if cached and len(pairs) < cached * Config.CRAWL_MIN_KEEP_RATIO:
+            raise RuntimeError(f"found only {len(pairs)} songs against {cached} cached, not replacing them")
+
+    def _cached_song_lookup(self) -> Callable[[str], Optional[Song]]:
+        """href -> Song of the installed generation (None if not cached), for songs a crawl failed to fetch"""
+        store = self._current.songs
+        rows = {href: i for i, href in enumerate(store.hrefs)}
+        return lambda href: store.row(rows[href]) if href in rows else None
+
+    async def _incremental_crawl(self, max_retries: int = 2):
+        current = self._current
+        store = current.songs
+        known = dict(zip(store.hrefs, zip(store.song, store.singer)))
+        
+        fetched = await self.crawl_new_songs(
+            known, max_pages=Config.DISCOVERY_PAGES, max_retries=max_retries, progress=self._progress
+        )
+        print(f"Crawled {len(fetched)} new or changed songs")
+        
+        # Changed entries are replaced in place, new ones go first (listing is newest-first)
+        fetched_by_href = {href: SongStore.record_of(href, song) for href, song in fetched}
+        new_records = [record for href, record in fetched_by_href.items() if href not in known]
+        old_records = []
+        updated = 0
+        for i, href in enumerate(store.hrefs):
+            record = store.record(i)
+            fetched_record = fetched_by_href.get(href)
+            if fetched_record is not None and fetched_record != record:
+                record = fetched_record
+                updated += 1
+            old_records.append(record)
+        self._record_run(DISCOVERY)
+        if new_records or updated:
+            await self._install_store(SongStore.from_records(new_records + old_records))
+        # Otherwise nothing changed: a new generation would only rebuild the index and expire cursors
+
+        return {"message": f"found {len(new_records)} new songs, {updated} updated, {len(self._current)} total"}
+
+    def _record_run(self, mode: str):
+        now = time.monotonic()
+        # A full crawl re-reads every song page, so it also counts as discovery and a views refresh
+        for name in CRAWL_MODES if mode == FULL else (mode,):
+            self._last_run[name] = now
+
+    async def _install(self, pairs: List[Tuple[str, Song]]):
+        """Build a new cache generation from crawl results and swap it in atomically"""
+        store = await asyncio.to_thread(SongStore.from_pairs, pairs)
+        await self._install_store(store)
+
+    async def _install_store(self, store: SongStore, index: SongSearchIndex = None, singers: SingerIndex = None):
+        """Index a store off the event loop and swap it in as the next generation"""
+        # Chord images resolved since these songs were crawled are folded in here
+        chord_images = self.chords.fill_images(store.chord_url, store.chord_image)
+        if chord_images is not None:
+            store = store.with_chord_images(chord_images)
+        generation = await asyncio.to_thread(SongGeneration.from_store, self._current.id + 1, store, index, singers)
+        self._install_generation(generation)
+        if self.chords.mode == BACKGROUND:
+            self.chords.enqueue_missing(store.chord_url, store.chord_image)
+        await self.chords.persist()
+        if self.http_cache is not None and not self.is_follower():
+            await self.http_cache.persist()
+        
+        if Config.SNAPSHOT_PATH:
+            try:
+                await asyncio.to_thread(self._write_snapshot, store, generation)
+                if self.cluster is not None:
+                    self.cluster.publish(generation.id)
+            except Exception as e:
+                print(f"Failed to save song snapshot: {type(e).__name__}: {e}")
+
+    def _install_generation(self, generation: SongGeneration):
+        self._current = generation
+        self._generations[generation.id] = generation
+        while len(self._generations) > max(Config.GENERATION_RETENTION, 1):
+            self._generations.popitem(last=False)
+        CACHE_SONGS.set(len(generation))
+        CACHE_GENERATION.set(generation.id)
+
+    def _write_snapshot(self, store: SongStore, generation: SongGeneration):
+        # The search index goes along so followers map it instead of rebuilding it in every worker
+        index = generation.index
+        write_snapshot(
+            Config.SNAPSHOT_PATH,
+            {
+                "href": store.hrefs,
+                "song": store.song,
+                "singer": store.singer,
+                "lyrics": store.lyrics,
+                "chord_image": store.chord_image,
+                "chord_url": store.chord_url,
+                "song_transcriber": store.song_transcriber,
+            },
+            {"views": store.views},
+            generation=generation.id,
+            meta={
+                "saved_at": time.time(),
+                "ngram_size": index.song.n,
+                "digest": generation.digest,
+                # Stored as wall-clock time so a restart keeps the crawl schedule
+                "last_run": {
+                    mode: time.time() - (time.monotonic() - last)
+                    for mode, last in self._last_run.items() if last is not None
+                },
+            },
+            sections=index.sections()
+        )
+
+    @staticmethod
+    def _read_snapshot(path: str, mapped: bool = False) -> Tuple[SongGeneration, dict]:
+        snapshot = SongSnapshot(path)
+        if mapped:
+            # Columns are read from the mapping (shared page cache), which lives as long as the generation
+            columns = {name: snapshot.column(name) for name in snapshot.columns()}
+            store = SongStore.wrap(columns.pop("href"), columns, columns.pop("views"))
+            index = None
+            n = Config.SEARCH_NGRAM_SIZE
+            if snapshot.sections and snapshot.meta.get("ngram_size") == n:
+                index = SongSearchIndex.from_sections(store.views, snapshot.sections, n)
+            # Hashing the mapped columns would decode all of them; the leader saved the digest
+            digest = snapshot.meta.get("digest")
+            return SongGeneration.from_store(snapshot.generation, store, index, digest=digest), snapshot.meta
+        try:
+            columns = {name: snapshot.column(name) for name in snapshot.columns()}
+            # Snapshots written before chord URLs were recorded have no chord_url column,
+            # which from_columns fills with ""
+            store = SongStore.from_columns(columns.pop("href"), columns, columns.pop("views"))
+            columns.clear()
+            generation, meta = snapshot.generation, snapshot.meta
+        finally:
+            snapshot.close()
+        return SongGeneration.from_store(generation, store, digest=meta.get("digest")), meta
+
+    async def load_snapshot(self, mapped: bool = False) -> bool:
+        """Load the last persisted crawl so the cache is warm before any crawl runs"""
+        loaded = await asyncio.to_thread(self.chords.load)
+        if loaded:
+            print(f"Loaded {loaded} memoized chord images from {self.chords.path}")
+        if not self.is_follower():
+            await self.load_http_cache()
+        return await self.install_snapshot(mapped)
+
+    async def load_http_cache(self):
+        """Load the HTTP cache index (leader only: loading evicts files over the size bound)"""
+        if self.http_cache is None:
+            return
+        cached = await asyncio.to_thread(self.http_cache.load)
+        if cached:
+            print(f"Loaded HTTP cache index of {cached} pages from {self.http_cache.directory}")
+
+    async def install_snapshot(self, mapped: bool = False) -> bool:
+        """Swap in the generation saved at SNAPSHOT_PATH; mapped keeps its columns in the file mapping"""
+        path = Config.SNAPSHOT_PATH
+        if not path or not os.path.exists(path):
+            return False
+        try:
+            generation, meta = await asyncio.to_thread(self._read_snapshot, path, mapped)
+        except Exception as e:
+            print(f"Failed to load song snapshot {path}: {type(e).__name__}: {e}")
+            return False
+        
+        last_run = meta.get("last_run", {})
+        if "views_refreshed_at" in meta:
+            # Snapshots written before the crawl scheduler only tracked view refreshes
+            last_run.setdefault(VIEWS, meta["views_refreshed_at"])
+        for mode, at in last_run.items():
+            if mode in self._last_run:
+                self._last_run[mode] = time.monotonic() - (time.time() - at)
+        self._install_generation(generation)
+        print(f"Loaded {len(generation)} songs from snapshot {path} (generation {generation.id})")
+        return True
     
-    def get_singers(self) -> set[str]:
-        return set(self._singers)
+    async def get_popular_songs(self) -> List[Song]:
+        """Return the last good popular list, refreshing it in the background once the TTL expires
+
+        Followers never fetch the site's list; they serve the most viewed songs of the snapshot.
+        """
+        if Config.POPULAR_SOURCE == "cache" or self.is_follower():
+            return list(self.local_popular_songs())
+        if self._popular_cache is None:
+            # Nothing to serve yet: wait for the shared in-flight refresh
+            return list(await asyncio.shield(self._start_popular_refresh()))
+
+        if time.monotonic() - self._popular_refreshed_at >= Config.POPULAR_CACHE_TTL:
+            self._start_popular_refresh()
+        return list(self._popular_cache)
+
+    def _start_popular_refresh(self) -> asyncio.Task:
+        """Start a popular list refresh unless one is already running (single-flight)"""
+        if self._popular_task is None or self._popular_task.done():
+            self._popular_task = asyncio.create_task(self._refresh_popular())
+        return self._popular_task
+
+    async def _refresh_popular(self) -> List[Song]:
+        try:
+            songs = await self.get_songs_list(1, popular=True)
+        except Exception as e:
+            print(f"Popular songs refresh failed: {type(e).__name__}: {e}")
+            songs = []
+
+        now = time.monotonic()
+        if songs:
+            self._popular_cache = songs
+            self._popular_refreshed_at = now
+        else:
+            # Keep serving the last good copy and retry sooner than a full TTL
+            self._popular_refreshed_at = now - Config.POPULAR_CACHE_TTL + Config.POPULAR_RETRY_INTERVAL
+        return self._popular_cache or []
+
+    def local_popular_songs(self, limit: int = None) -> SongRows:
+        """Most viewed songs of the installed generation, read from its views ordering"""
+        generation = self._current
+        return generation.songs.select(generation.index.top_views(limit or Config.POPULAR_LOCAL_SIZE))
+
+    def get_singers(self) -> SingerIndex:
+        """Sorted singer index of the installed generation (shared, read-only)"""
+        return self._current.singers
     
-    def get_songs(self) -> List[Song]:
-        return list(self._songs_cache)
\ No newline at end of file
+    def get_songs(self) -> SongStore:
+        """Read-only view of the cached songs; Song models are built as rows are read"""
+        return self._current.songs
+
+    def get_generation(self) -> int:
+        return self._current.id
+
+    async def resolve_chords(self, songs: List[Song]) -> List[Song]:
+        """Fill chord images for songs about to be served (see ChordResolver.fill_page)"""
+        return await self.chords.fill_page(songs)
+
+    def generation(self, generation_id: int) -> Optional[SongGeneration]:
+        """A retained generation by id (see GENERATION_RETENTION), or None once it was dropped"""
+        return self._generations.get(generation_id)
+
+    def current_generation(self) -> SongGeneration:
+        """The installed generation; hold on to it to read songs and indexes consistently"""
+        return self._current
\ No newline at end of file
@@ -0,0 +1,61 @@
+from array import array
+from bisect import bisect_left
+from typing import Dict, List, Optional, Sequence
+
+
+class SingerIndex:
+    """Sorted, deduplicated singers of one cache generation with the rows of their songs
+
+    Singers are ordered case-insensitively, so paging is stable and a name prefix
+    is a bisect. Song ids are stored back to back in one array (cache order within
+    each singer). Rows without a singer (titles with no " - ") are left out.
+    """
+
+    def __init__(self, singers: Sequence[str]):
+        groups: Dict[str, array] = {}
+        for doc_id, name in enumerate(singers):
+            if name:
+                ids = groups.get(name)
+                if ids is None:
+                    ids = groups[name] = array('I')
+                ids.append(doc_id)
+
+        self.names: List[str] = sorted(groups, key=lambda name: (name.lower(), name))
+        self.keys: List[str] = [name.lower() for name in self.names]
+        self.counts = array('I', (len(groups[name]) for name in self.names))
+        self.ids = array('I')
+        self.starts = array('I')
+        for name in self.names:
+            self.starts.append(len(self.ids))
+            self.ids.extend(groups[name])
+        self.starts.append(len(self.ids))
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: str) -> bool:
+        return self.find(name) is not None
+
+    def prefix(self, query: str) -> range:
+        """Positions of singers whose name starts with query (case-insensitive)"""
+        query = query.lower()
+        start = bisect_left(self.keys, query)
+        end = bisect_left(self.keys, query + "\U0010ffff", start)
+        return range(start, end)
+
+    def find(self, name: str) -> Optional[int]:
+        """Position of a singer by exact name, else by case-insensitive name"""
+        key = name.lower()
+        position = bisect_left(self.keys, key)
+        first = None
+        while position < len(self.keys) and self.keys[position] == key:
+            if self.names[position] == name:
+                return position
+            if first is None:
+                first = position
+            position += 1
+        return first
+
+    def song_ids(self, position: int) -> array:
+        """Row ids of the songs of the singer at position, in cache order"""
+        return self.ids[self.starts[position]:self.starts[position + 1]]
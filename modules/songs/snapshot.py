@@ -0,0 +1,223 @@
+import json
+import mmap
+import os
+import struct
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+
+# File layout (little endian):
+#   MAGIC | u32 header length | JSON header | padding to 8 bytes | column data
+# A str column is int64 offsets[count + 1] followed by its UTF-8 blob, an int64
+# column is a plain int64[count]. Sections are the same encodings (or an array of any
+# typecode) with their own length, padded to 8 bytes. Offsets in the header are absolute
+# file offsets, so a reader can mmap the file and slice any field without parsing the rest.
+MAGIC = b"TOCSNAP\x00"
+VERSION = 1
+_HEADER_LEN = struct.Struct("<I")
+
+
+def _pad(size: int) -> int:
+    return (8 - size % 8) % 8
+
+
+class StrColumn(Sequence[str]):
+    """Read-only string column decoded lazily from a mapped snapshot"""
+
+    def __init__(self, buf: memoryview, offsets_at: int, blob_at: int, count: int):
+        self._buf = buf
+        # The mmap itself, for find() over the raw bytes
+        self._data = buf.obj
+        self._offsets = buf[offsets_at:offsets_at + 8 * (count + 1)].cast('q')
+        self._blob_at = blob_at
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._count))]
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError(i)
+        start = self._blob_at + self._offsets[i]
+        end = self._blob_at + self._offsets[i + 1]
+        return str(self._buf[start:end], "utf-8")
+
+    def containing(self, term: str, ids: Optional[Iterable[int]] = None) -> List[int]:
+        """Rows (of ids, or all rows) whose text contains term, in ascending order
+
+        Searches the UTF-8 bytes in place, which finds the same rows as decoding each one
+        (UTF-8 never matches in the middle of a character) without building the strings.
+        """
+        needle = term.encode("utf-8")
+        offsets, blob_at, find = self._offsets, self._blob_at, self._data.find
+        if ids is None:
+            ids = range(self._count)
+        return [i for i in ids if find(needle, blob_at + offsets[i], blob_at + offsets[i + 1]) >= 0]
+
+
+class SongSnapshot:
+    """Memory-mapped view of a snapshot file written by write_snapshot"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buf = memoryview(self._mmap)
+        if bytes(buf[:len(MAGIC)]) != MAGIC:
+            buf.release()
+            self._mmap.close()
+            raise ValueError(f"{path} is not a song snapshot")
+
+        (header_len,) = _HEADER_LEN.unpack_from(buf, len(MAGIC))
+        header_at = len(MAGIC) + _HEADER_LEN.size
+        self.header: dict = json.loads(bytes(buf[header_at:header_at + header_len]))
+        if self.header.get("version") != VERSION:
+            buf.release()
+            self._mmap.close()
+            raise ValueError(f"{path} has unsupported snapshot version {self.header.get('version')}")
+
+        self._buf = buf
+        self.count: int = self.header["count"]
+        self.generation: int = self.header.get("generation", 0)
+        self.meta: dict = self.header.get("meta", {})
+        self._columns: Dict[str, Union[StrColumn, memoryview]] = {}
+        for name, spec in self.header["columns"].items():
+            if spec["type"] == "str":
+                self._columns[name] = StrColumn(buf, spec["offsets"], spec["blob"], self.count)
+            else:
+                self._columns[name] = buf[spec["data"]:spec["data"] + 8 * self.count].cast('q')
+        # Snapshots written before sections existed have none
+        self.sections: Dict[str, Union[StrColumn, memoryview]] = {}
+        for name, spec in self.header.get("sections", {}).items():
+            if spec["type"] == "str":
+                self.sections[name] = StrColumn(buf, spec["offsets"], spec["blob"], spec["count"])
+            else:
+                size = array(spec["typecode"]).itemsize
+                self.sections[name] = buf[spec["data"]:spec["data"] + size * spec["count"]].cast(spec["typecode"])
+
+    def __len__(self) -> int:
+        return self.count
+
+    def column(self, name: str) -> Union[StrColumn, memoryview]:
+        return self._columns[name]
+
+    def columns(self) -> List[str]:
+        return list(self._columns)
+
+    def close(self):
+        for col in (*self._columns.values(), *self.sections.values()):
+            if isinstance(col, memoryview):
+                col.release()
+            else:
+                col._offsets.release()
+        self._columns.clear()
+        self.sections.clear()
+        self._buf.release()
+        self._mmap.close()
+
+
+def _encode_str(values: Sequence[str]) -> tuple:
+    blobs = [v.encode("utf-8") for v in values]
+    offsets = array('q', [0])
+    total = 0
+    for blob in blobs:
+        total += len(blob)
+        offsets.append(total)
+    return "str", offsets.tobytes(), b"".join(blobs)
+
+
+def write_snapshot(
+    path: str,
+    str_columns: Dict[str, Sequence[str]],
+    int_columns: Dict[str, Sequence[int]] = None,
+    generation: int = 0,
+    meta: Optional[dict] = None,
+    sections: Optional[Dict[str, Union[Sequence[str], array]]] = None
+):
+    """Write equally long string and int64 columns, plus sections of any length, to path atomically
+
+    A section is a sequence of str or an array; readers get it back as a StrColumn
+    or a memoryview cast to the array's typecode.
+    """
+    int_columns = int_columns or {}
+    counts = {len(values) for values in (*str_columns.values(), *int_columns.values())}
+    if len(counts) > 1:
+        raise ValueError("snapshot columns must have the same length")
+    count = counts.pop() if counts else 0
+
+    # Encode everything first so the header can carry absolute offsets
+    encoded = {}
+    for name, values in str_columns.items():
+        encoded[name] = _encode_str(values)
+    for name, values in int_columns.items():
+        encoded[name] = ("int64", array('q', values).tobytes(), None)
+    encoded_sections = {}
+    for name, values in (sections or {}).items():
+        if isinstance(values, array):
+            encoded_sections[name] = ("array", values.tobytes(), None, values.typecode, len(values))
+        else:
+            encoded_sections[name] = (*_encode_str(values), None, len(values))
+
+    def build_header(base: int) -> bytes:
+        at = base
+
+        def place(kind: str, first: bytes, blob: Optional[bytes]) -> dict:
+            nonlocal at
+            if kind == "str":
+                spec = {"type": "str", "offsets": at, "blob": at + len(first)}
+                at += len(first) + len(blob) + _pad(len(first) + len(blob))
+            else:
+                spec = {"type": kind, "data": at}
+                at += len(first) + _pad(len(first))
+            return spec
+
+        specs = {name: place(*item) for name, item in encoded.items()}
+        section_specs = {}
+        for name, (kind, first, blob, typecode, length) in encoded_sections.items():
+            spec = section_specs[name] = place(kind, first, blob)
+            spec["count"] = length
+            if typecode is not None:
+                spec["typecode"] = typecode
+        header = {
+            "version": VERSION,
+            "count": count,
+            "generation": generation,
+            "meta": meta or {},
+            "columns": specs,
+        }
+        if section_specs:
+            header["sections"] = section_specs
+        return json.dumps(header, ensure_ascii=False).encode("utf-8")
+
+    # The header length depends on the offsets it contains, so iterate until stable
+    prefix = len(MAGIC) + _HEADER_LEN.size
+    header = build_header(0)
+    while True:
+        base = prefix + len(header) + _pad(prefix + len(header))
+        candidate = build_header(base)
+        if len(candidate) == len(header):
+            header = candidate
+            break
+        header = candidate
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(_HEADER_LEN.pack(len(header)))
+        f.write(header)
+        f.write(b"\x00" * _pad(prefix + len(header)))
+        for kind, first, blob in (*encoded.values(), *(item[:3] for item in encoded_sections.values())):
+            f.write(first)
+            if kind == "str":
+                f.write(blob)
+                f.write(b"\x00" * _pad(len(first) + len(blob)))
+            else:
+                f.write(b"\x00" * _pad(len(first)))
+        f.flush()
+        os.fsync(f.fileno())
+    # Replacing the file keeps readers that already mapped the old inode valid
+    os.replace(tmp_path, path)
@@ -0,0 +1,189 @@
+import hashlib
+from array import array
+from collections.abc import Sequence
+from typing import Dict, Iterable, Iterator, List, Tuple
+from .models import Song
+
+# One song as a plain tuple, in SongStore column order
+SongRecord = Tuple[str, str, str, str, str, int, str, str]
+
+
+class SongStore(Sequence):
+    """Read-only columnar storage for the songs of one cache generation
+
+    Every field is a parallel tuple, views are an array('q'), and repeated singer,
+    transcriber and chord strings share a single object. Song models are only built
+    when a row is read, so serving a page costs page-size models however big the
+    store is. Iterating or slicing builds models on the fly and copies nothing else.
+    """
+
+    __slots__ = ("hrefs", "song", "singer", "lyrics", "chord_image", "views", "song_transcriber", "chord_url")
+
+    def __init__(
+        self,
+        hrefs: Tuple[str, ...],
+        song: Tuple[str, ...],
+        singer: Tuple[str, ...],
+        lyrics: Tuple[str, ...],
+        chord_image: Tuple[str, ...],
+        views: array,
+        song_transcriber: Tuple[str, ...],
+        chord_url: Tuple[str, ...]
+    ):
+        self.hrefs = hrefs
+        self.song = song
+        self.singer = singer
+        self.lyrics = lyrics
+        self.chord_image = chord_image
+        self.views = views
+        self.song_transcriber = song_transcriber
+        self.chord_url = chord_url
+
+    @classmethod
+    def from_records(cls, records: Iterable[SongRecord]) -> "SongStore":
+        records = list(records)
+        pool: Dict[str, str] = {}
+        shared = pool.setdefault  # one object per distinct repeated string
+
+        def text(position: int, share: bool = False) -> Tuple[str, ...]:
+            if share:
+                return tuple(shared(record[position], record[position]) for record in records)
+            return tuple(record[position] for record in records)
+
+        return cls(
+            hrefs=text(0),
+            song=text(1),
+            singer=text(2, share=True),
+            lyrics=text(3),
+            chord_image=text(4, share=True),
+            views=array('q', (record[5] for record in records)),
+            song_transcriber=text(6, share=True),
+            chord_url=text(7, share=True)
+        )
+
+    @classmethod
+    def from_pairs(cls, pairs: Iterable[Tuple[str, Song]]) -> "SongStore":
+        return cls.from_records(cls.record_of(href, song) for href, song in pairs)
+
+    @classmethod
+    def from_columns(cls, hrefs: Sequence, columns: Dict[str, Sequence], views: Sequence[int]) -> "SongStore":
+        """Build from whole columns (e.g. a snapshot); missing text columns default to ''"""
+        count = len(hrefs)
+        empty = ("",) * count
+        return cls.from_records(zip(
+            hrefs,
+            columns.get("song", empty),
+            columns.get("singer", empty),
+            columns.get("lyrics", empty),
+            columns.get("chord_image", empty),
+            views,
+            columns.get("song_transcriber", empty),
+            columns.get("chord_url", empty)
+        ))
+
+    @classmethod
+    def wrap(cls, hrefs: Sequence, columns: Dict[str, Sequence], views: Sequence[int]) -> "SongStore":
+        """Use whole columns as they are, without copying (e.g. a memory-mapped snapshot)"""
+        empty = ("",) * len(hrefs)
+        return cls(
+            hrefs=hrefs,
+            song=columns.get("song", empty),
+            singer=columns.get("singer", empty),
+            lyrics=columns.get("lyrics", empty),
+            chord_image=columns.get("chord_image", empty),
+            views=views,
+            song_transcriber=columns.get("song_transcriber", empty),
+            chord_url=columns.get("chord_url", empty)
+        )
+
+    @classmethod
+    def empty(cls) -> "SongStore":
+        return cls((), (), (), (), (), array('q'), (), ())
+
+    @staticmethod
+    def record_of(href: str, song: Song) -> SongRecord:
+        return (href, song.song, song.singer, song.lyrics, song.chord_image, song.views, song.song_transcriber, song.chord_url)
+
+    def record(self, i: int) -> SongRecord:
+        return (
+            self.hrefs[i], self.song[i], self.singer[i], self.lyrics[i],
+            self.chord_image[i], self.views[i], self.song_transcriber[i], self.chord_url[i]
+        )
+
+    def row(self, i: int) -> Song:
+        """Song model for row i"""
+        return Song(
+            song=self.song[i],
+            singer=self.singer[i],
+            lyrics=self.lyrics[i],
+            chord_image=self.chord_image[i],
+            views=self.views[i],
+            song_transcriber=self.song_transcriber[i],
+            chord_url=self.chord_url[i]
+        )
+
+    def rows(self, ids: Iterable[int]) -> List[Song]:
+        return [self.row(i) for i in ids]
+
+    def select(self, ids: Sequence[int]) -> "SongRows":
+        """Lazy view of the given rows; models are built only for what is read from it"""
+        return SongRows(self, ids)
+
+    def with_views(self, views: array) -> "SongStore":
+        """Copy sharing every column except views"""
+        return SongStore(
+            self.hrefs, self.song, self.singer, self.lyrics,
+            self.chord_image, views, self.song_transcriber, self.chord_url
+        )
+
+    def with_chord_images(self, chord_image: Tuple[str, ...]) -> "SongStore":
+        """Copy sharing every column except chord_image"""
+        return SongStore(
+            self.hrefs, self.song, self.singer, self.lyrics,
+            chord_image, self.views, self.song_transcriber, self.chord_url
+        )
+
+    def digest(self) -> str:
+        """Hash of every column, so equal digests mean equal content (CPU-bound, run it off the event loop)"""
+        h = hashlib.blake2b(digest_size=12)
+        for column in (self.hrefs, self.song, self.singer, self.lyrics, self.chord_image, self.song_transcriber, self.chord_url):
+            h.update("\0".join(column).encode())
+            h.update(b"\1")
+        h.update(array('q', self.views).tobytes())
+        return h.hexdigest()
+
+    def __len__(self) -> int:
+        return len(self.hrefs)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return self.rows(range(*key.indices(len(self))))
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError(key)
+        return self.row(key)
+
+    def __iter__(self) -> Iterator[Song]:
+        return map(self.row, range(len(self)))
+
+
+class SongRows(Sequence):
+    """Read-only selection of SongStore rows (e.g. search results) built lazily"""
+
+    __slots__ = ("store", "ids")
+
+    def __init__(self, store: SongStore, ids: Sequence[int]):
+        self.store = store
+        self.ids = ids
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return self.store.rows(self.ids[key])
+        return self.store.row(self.ids[key])
+
+    def __iter__(self) -> Iterator[Song]:
+        return map(self.store.row, self.ids)
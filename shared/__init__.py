@@ -1,5 +1,21 @@
 from .http_client import fetch
+from .http_cache import HttpCache, normalize_url
+from .leader import FileLeaderLock
+from .limiter import AdaptiveLimiter, parse_retry_after
+from .metrics import REGISTRY, MetricsRegistry
+from .persisted import PersistedMap, atomic_write
+from .retry import RetryPolicy
 
 __all__ = [
     "fetch",
+    "HttpCache",
+    "normalize_url",
+    "FileLeaderLock",
+    "AdaptiveLimiter",
+    "parse_retry_after",
+    "REGISTRY",
+    "MetricsRegistry",
+    "PersistedMap",
+    "atomic_write",
+    "RetryPolicy",
 ]
\ No newline at end of file
@@ -0,0 +1,276 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+from urllib.parse import parse_qsl, quote, unquote, urlencode, urlsplit, urlunsplit
+from .persisted import PersistedMap, atomic_write
+
+INDEX_FILE = "index.json"
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url: str) -> str:
+    """Cache key of a URL: lowercase scheme and host, no default port or fragment, canonical escapes, sorted query"""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    port = parts.port
+    netloc = host if port is None or port == DEFAULT_PORTS.get(scheme) else f"{host}:{port}"
+    path = quote(unquote(parts.path), safe="/-._~!$&'()*+,;=:@") or "/"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, netloc, path, query, ""))
+
+
+def content_hash(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _tuples(value: Any) -> Any:
+    # Parse results are tuples; JSON hands them back as lists
+    if isinstance(value, list):
+        return tuple(_tuples(v) for v in value)
+    return value
+
+
+class CachedPage:
+    """Index entry of one cached response body"""
+
+    __slots__ = ("key", "kind", "etag", "last_modified", "hash", "size", "fetched_at", "partial", "parsed")
+
+    def __init__(
+        self,
+        key: str,
+        kind: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        hash: str = "",
+        size: int = 0,
+        fetched_at: float = 0.0,
+        partial: bool = False,
+        parsed: Iterable[str] = ()
+    ):
+        self.key = key
+        self.kind = kind
+        self.etag = etag
+        self.last_modified = last_modified
+        self.hash = hash
+        self.size = size
+        self.fetched_at = fetched_at
+        # Body is a prefix of the page (a streamed fetch stopped early)
+        self.partial = partial
+        # Names of the parse results stored for this hash
+        self.parsed = set(parsed)
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers for revalidating this body"""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def to_dict(self) -> dict:
+        return {
+            "kind": self.kind,
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+            "hash": self.hash,
+            "size": self.size,
+            "fetched_at": self.fetched_at,
+            "partial": self.partial,
+            "parsed": sorted(self.parsed),
+        }
+
+
+class HttpCache:
+    """On-disk cache of fetched page bodies keyed by normalized URL
+
+    Each body is a file under directory (named by a hash of its key), next to the
+    parse results stored for it; the index of validators (ETag, Last-Modified),
+    content hashes and sizes lives in memory and is written to index.json. Within
+    ttls[kind] seconds of being fetched a body is served as-is, after that it is
+    revalidated with a conditional request. Kinds without a TTL are not cached.
+    Total size is bounded by max_bytes, evicting least recently used bodies first.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, ttls: Dict[str, float]):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttls = ttls
+        self._entries: OrderedDict[str, CachedPage] = OrderedDict()
+        self.total_bytes = 0
+        self._index = PersistedMap(
+            os.path.join(directory, INDEX_FILE),
+            "HTTP cache index",
+            lambda: {key: entry.to_dict() for key, entry in self._entries.items()}
+        )
+
+    def cacheable(self, kind: str) -> bool:
+        return kind in self.ttls
+
+    def entry(self, url: str) -> Optional[CachedPage]:
+        key = normalize_url(url)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def fresh(self, entry: CachedPage) -> bool:
+        """Still within its kind's TTL, so it can be used without asking the origin"""
+        return time.time() - entry.fetched_at < self.ttls.get(entry.kind, 0)
+
+    def _path(self, key: str, parsed: str = None) -> str:
+        name = hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+        if parsed:
+            name = f"{name}.{parsed}.json"
+        return os.path.join(self.directory, name[:2], name)
+
+    async def read(self, entry: CachedPage) -> Optional[str]:
+        """Cached body, or None (and the entry is dropped) if its file is gone"""
+        try:
+            return await asyncio.to_thread(self._read_file, self._path(entry.key))
+        except OSError:
+            self._drop(entry.key)
+            return None
+
+    async def store(
+        self,
+        url: str,
+        kind: str,
+        text: str,
+        etag: Optional[str],
+        last_modified: Optional[str],
+        partial: bool = False
+    ) -> bool:
+        """Cache a freshly fetched body; returns False when it has the same hash as the cached one"""
+        key = normalize_url(url)
+        digest = content_hash(text)
+        entry = self._entries.get(key)
+        changed = entry is None or entry.hash != digest
+        if entry is None:
+            entry = self._entries[key] = CachedPage(key, kind)
+        self._entries.move_to_end(key)
+        entry.kind = kind
+        entry.etag = etag
+        entry.last_modified = last_modified
+        entry.fetched_at = time.time()
+        entry.partial = partial
+        if changed:
+            # Parse results belong to the old body
+            stale = [self._path(key, name) for name in entry.parsed]
+            entry.parsed.clear()
+            entry.hash = digest
+            data = text.encode("utf-8")
+            self._resize(entry, len(data))
+            await asyncio.to_thread(self._write_body, self._path(key), data, stale)
+        self._index.dirty = True
+        await self._evict()
+        return changed
+
+    def revalidated(self, entry: CachedPage):
+        """The origin confirmed the cached body (304): restart its TTL"""
+        entry.fetched_at = time.time()
+        self._index.dirty = True
+
+    async def read_parsed(self, entry: CachedPage, name: str) -> Tuple[bool, Any]:
+        """(True, result) of the parse stored as name for the entry's current body, else (False, None)"""
+        if name not in entry.parsed:
+            return False, None
+        try:
+            raw = await asyncio.to_thread(self._read_file, self._path(entry.key, name))
+            return True, _tuples(json.loads(raw))
+        except (OSError, ValueError):
+            entry.parsed.discard(name)
+            return False, None
+
+    async def store_parsed(self, entry: CachedPage, name: str, digest: str, result: Any):
+        """Keep a parse result of the body with hash digest, so it is not parsed again while unchanged"""
+        if entry.key not in self._entries or entry.hash != digest:
+            return
+        data = json.dumps(result, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        path = self._path(entry.key, name)
+        await asyncio.to_thread(atomic_write, path, data)
+        if entry.key not in self._entries or entry.hash != digest:
+            # Replaced or evicted while writing
+            await asyncio.to_thread(self._remove_files, [path])
+            return
+        if name not in entry.parsed:
+            entry.parsed.add(name)
+            self._resize(entry, entry.size + len(data))
+            self._index.dirty = True
+
+    def _resize(self, entry: CachedPage, size: int):
+        self.total_bytes += size - entry.size
+        entry.size = size
+
+    def _over_bound(self) -> list:
+        """Drop least recently used entries until the cache fits max_bytes; returns their files"""
+        paths = []
+        while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+            key, entry = self._entries.popitem(last=False)
+            self.total_bytes -= entry.size
+            paths.append(self._path(key))
+            paths.extend(self._path(key, name) for name in entry.parsed)
+            self._index.dirty = True
+        return paths
+
+    async def _evict(self):
+        paths = self._over_bound()
+        if paths:
+            await asyncio.to_thread(self._remove_files, paths)
+
+    def _drop(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= entry.size
+            self._index.dirty = True
+
+    @staticmethod
+    def _read_file(path: str) -> str:
+        with open(path, encoding="utf-8") as f:
+            return f.read()
+
+    def _write_body(self, path: str, data: bytes, stale: list):
+        atomic_write(path, data)
+        self._remove_files(stale)
+
+    @staticmethod
+    def _remove_files(paths: Iterable[str]):
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def load(self) -> int:
+        """Load the index written by save(), returning how many bodies it lists"""
+        entries = self._index.load()
+        if entries is None:
+            return 0
+        self._entries.clear()
+        self.total_bytes = 0
+        for key, fields in entries.items():
+            entry = self._entries[key] = CachedPage(key, **fields)
+            self.total_bytes += entry.size
+        # max_bytes may have been lowered since the index was written
+        self._remove_files(self._over_bound())
+        return len(self._entries)
+
+    def save(self):
+        """Write the index if it changed since the last save"""
+        self._index.save()
+
+    async def persist(self):
+        """save() with the file write off the event loop"""
+        await self._index.persist()
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+        }
@@ -0,0 +1,54 @@
+import os
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, so no multi-worker leader election
+    fcntl = None
+
+
+class FileLeaderLock:
+    """Leader election between processes on one host through an exclusive flock
+
+    The lock is taken without blocking and held for the life of the process; the
+    kernel drops it when the holder exits (even on a crash), so a waiting process
+    can take over by calling try_acquire again.
+    """
+
+    def __init__(self, path: str):
+        if fcntl is None:
+            raise RuntimeError("file leader election needs fcntl (POSIX only)")
+        self.path = path
+        self._fd: Optional[int] = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self._fd is not None
+
+    def try_acquire(self) -> bool:
+        """Become the leader if no other process holds the lock"""
+        if self._fd is not None:
+            return True
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        except BaseException:
+            os.close(fd)
+            raise
+        # The pid is informational only; the flock is what decides leadership
+        os.ftruncate(fd, 0)
+        os.write(fd, f"{os.getpid()}\n".encode())
+        self._fd = fd
+        return True
+
+    def release(self):
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
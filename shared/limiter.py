@@ -0,0 +1,190 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Dict, Optional
+from urllib.parse import urlsplit
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+
+
+class Slot:
+    """One in-flight request; the caller records what the origin answered"""
+
+    __slots__ = ("status", "retry_after")
+
+    def __init__(self):
+        self.status: Optional[int] = None
+        self.retry_after: Optional[float] = None
+
+
+class HostLimit:
+    """AIMD concurrency limit for a single host
+
+    The limit grows by about one request per round of successful responses and is
+    multiplied by `decrease` on a timeout, 429, 5xx, or when recent latency climbs
+    above `latency_tolerance` times the long-run average. Decreases happen at most
+    once per observed latency so a burst of failures only counts as one signal.
+    """
+
+    def __init__(
+        self,
+        initial: float,
+        minimum: float,
+        maximum: float,
+        decrease: float,
+        latency_tolerance: float
+    ):
+        self.limit = float(initial)
+        self.minimum = float(minimum)
+        self.maximum = float(maximum)
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self.short_latency: Optional[float] = None
+        self.long_latency: Optional[float] = None
+        self._last_decrease = 0.0
+        self._waiters: deque[asyncio.Future] = deque()
+
+    async def acquire(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            delay = self.blocked_until - time.monotonic()
+            if delay > 0:
+                # Origin asked us to back off (Retry-After): nobody goes out until then
+                await asyncio.sleep(delay)
+                continue
+            if self.in_flight < int(self.limit):
+                self.in_flight += 1
+                return
+
+            waiter = loop.create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done():
+                    # We were woken but will not use the capacity: pass it on
+                    self._wake()
+                else:
+                    self._waiters.remove(waiter)
+                raise
+
+    def release(self, latency: float, congested: bool, retry_after: Optional[float] = None):
+        self.in_flight -= 1
+        now = time.monotonic()
+
+        if retry_after:
+            self.blocked_until = max(self.blocked_until, now + retry_after)
+
+        self.short_latency = latency if self.short_latency is None else 0.8 * self.short_latency + 0.2 * latency
+        self.long_latency = latency if self.long_latency is None else 0.98 * self.long_latency + 0.02 * latency
+        if not congested and self.short_latency > self.long_latency * self.latency_tolerance:
+            congested = True
+
+        if congested:
+            if now - self._last_decrease >= (self.short_latency or 0):
+                self.limit = max(self.minimum, self.limit * self.decrease)
+                self._last_decrease = now
+        else:
+            self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+
+        self._wake()
+
+    def cancel(self):
+        """Give a slot back without counting it as a success or failure"""
+        self.in_flight -= 1
+        self._wake()
+
+    def _wake(self):
+        free = int(self.limit) - self.in_flight
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+    def snapshot(self) -> dict:
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "waiting": len(self._waiters),
+            "latency_short": self.short_latency,
+            "latency_long": self.long_latency,
+            "blocked_for": max(0.0, self.blocked_until - time.monotonic()),
+        }
+
+
+class AdaptiveLimiter:
+    """Per-host adaptive concurrency limiter for outbound HTTP requests
+
+    Usage:
+        async with limiter.slot(url) as slot:
+            response = ...
+            slot.status = response.status
+            slot.retry_after = parse_retry_after(response.headers.get("Retry-After"))
+    """
+
+    CONGESTION_STATUSES = {429, 502, 503, 504}
+
+    def __init__(
+        self,
+        initial: float = 10,
+        minimum: float = 1,
+        maximum: float = 64,
+        decrease: float = 0.5,
+        latency_tolerance: float = 2.0
+    ):
+        self.initial = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+        self._hosts: Dict[str, HostLimit] = {}
+
+    def host(self, url: str) -> HostLimit:
+        netloc = urlsplit(url).netloc
+        limit = self._hosts.get(netloc)
+        if limit is None:
+            limit = self._hosts[netloc] = HostLimit(
+                self.initial, self.minimum, self.maximum, self.decrease, self.latency_tolerance
+            )
+        return limit
+
+    @asynccontextmanager
+    async def slot(self, url: str) -> AsyncIterator[Slot]:
+        host = self.host(url)
+        await host.acquire()
+        slot = Slot()
+        started = time.monotonic()
+        try:
+            yield slot
+        except asyncio.CancelledError:
+            # Cancelled by our own caller, which says nothing about the origin
+            host.cancel()
+            raise
+        except BaseException:
+            # Timeouts, resets and disconnects are all signs the origin is struggling
+            host.release(time.monotonic() - started, True, slot.retry_after)
+            raise
+        status = slot.status
+        congested = status is not None and (status in self.CONGESTION_STATUSES or status >= 500)
+        host.release(time.monotonic() - started, congested, slot.retry_after)
+
+    def snapshot(self) -> Dict[str, dict]:
+        return {netloc: limit.snapshot() for netloc, limit in self._hosts.items()}
+
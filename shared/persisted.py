@@ -0,0 +1,69 @@
+import asyncio
+import json
+import os
+from typing import Callable, Optional
+
+
+def atomic_write(path: str, data: bytes):
+    """Write data to path through a temporary file and a rename, so readers never see a partial file"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class PersistedMap:
+    """JSON file mirroring an in-memory LRU mapping between restarts
+
+    The owner keeps its entries in an OrderedDict from least to most recently used,
+    sets dirty when they change and reads them back with load() in file order, which
+    restores the recency order. serialize() is called on the event loop, so the
+    mapping is copied consistently, and persist() writes the copy in a thread.
+    """
+
+    def __init__(self, path: Optional[str], name: str, serialize: Callable[[], dict]):
+        self.path = path
+        self.name = name
+        self.serialize = serialize
+        self.dirty = False
+
+    def load(self) -> Optional[dict]:
+        """Mapping written by the last save, or None if there is none (or it is unreadable)"""
+        if not self.path or not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Failed to load {self.name} {self.path}: {type(e).__name__}: {e}")
+            return None
+        self.dirty = False
+        return data
+
+    def save(self):
+        """Write the mapping if it changed since the last save"""
+        data = self._unsaved()
+        if data is not None:
+            self._write(data)
+
+    async def persist(self):
+        """save() with the file write off the event loop"""
+        data = self._unsaved()
+        if data is not None:
+            await asyncio.to_thread(self._write, data)
+
+    def _unsaved(self) -> Optional[dict]:
+        if not self.path or not self.dirty:
+            return None
+        self.dirty = False
+        return self.serialize()
+
+    def _write(self, data: dict):
+        try:
+            atomic_write(self.path, json.dumps(data, ensure_ascii=False).encode("utf-8"))
+        except OSError as e:
+            self.dirty = True
+            print(f"Failed to save {self.name} {self.path}: {type(e).__name__}: {e}")
@@ -0,0 +1,173 @@
+import asyncio
+import random
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+# Circuit breaker states
+CLOSED = "closed"  # requests flow
+OPEN = "open"  # requests wait until the cooldown is over
+HALF_OPEN = "half_open"  # one probe request decides whether to close or open again
+
+
+class Attempt:
+    """One request attempt; the caller sets failed once it knows whether the origin answered well
+
+    An exception while failed is still None (timeout, reset, ...) counts as a failure.
+    """
+
+    __slots__ = ("failed", "probe")
+
+    def __init__(self, probe: bool = False):
+        self.failed: Optional[bool] = None
+        self.probe = probe
+
+
+class RetryPolicy:
+    """Shared retry budget, backoff and circuit breaker for outbound requests
+
+    Usage:
+        for retry in itertools.count():
+            async with policy.attempt() as attempt:
+                response = ...
+                attempt.failed = response.status >= 500
+            if not attempt.failed or not policy.allow_retry():
+                break
+            await asyncio.sleep(policy.backoff(retry))
+
+    Retries are capped per crawl at `budget` times the requests made so far (plus
+    `min_retries` so a crawl can start), so a degrading origin costs a bounded amount
+    of extra traffic instead of every caller retrying on its own. Backoff is
+    exponential with full jitter. When more than `error_rate` of the last `window`
+    attempts failed, the breaker opens and every attempt waits `cooldown` seconds;
+    then a single probe goes out and closes the breaker again if it succeeds.
+    """
+
+    def __init__(
+        self,
+        budget: float = 0.1,
+        min_retries: int = 10,
+        base_delay: float = 0.5,
+        max_delay: float = 10.0,
+        error_rate: float = 0.5,
+        window: int = 50,
+        min_requests: int = 20,
+        cooldown: float = 30.0
+    ):
+        self.budget = budget
+        self.min_retries = min_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.error_rate = error_rate
+        self.min_requests = min_requests
+        self.cooldown = cooldown
+
+        self.requests = 0
+        self.retries = 0
+        self.denied = 0
+        self.state = CLOSED
+        self.opened = 0
+        self.open_until = 0.0
+        self._outcomes: deque[bool] = deque(maxlen=window)
+        self._probing = False
+        self._settled = asyncio.Event()
+
+    def reset_budget(self):
+        """Start a new retry budget (once per crawl); the breaker keeps its state"""
+        self.requests = 0
+        self.retries = 0
+        self.denied = 0
+
+    def allow_retry(self) -> bool:
+        """Spend one retry from the budget, or False when it is used up"""
+        if self.retries >= self.min_retries + self.budget * self.requests:
+            self.denied += 1
+            return False
+        self.retries += 1
+        return True
+
+    def backoff(self, retry: int) -> float:
+        """Seconds to wait before retry number retry (0-based): full jitter over an exponential cap"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** retry))
+
+    @asynccontextmanager
+    async def attempt(self) -> AsyncIterator[Attempt]:
+        attempt = Attempt(await self._acquire())
+        try:
+            yield attempt
+        except asyncio.CancelledError:
+            # Neither a success nor a failure, so nothing is recorded; a held probe slot is handed back
+            if attempt.probe:
+                self._abandon_probe()
+            raise
+        except BaseException:
+            self._record(attempt.failed is False, attempt.probe)
+            raise
+        self._record(not attempt.failed, attempt.probe)
+
+    async def _acquire(self) -> bool:
+        """Wait until the breaker lets a request out; True if it goes out as the half-open probe"""
+        probe = False
+        while True:
+            if self.state == CLOSED:
+                break
+            delay = self.open_until - time.monotonic()
+            if self.state == OPEN and delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            if self.state == OPEN:
+                self.state = HALF_OPEN
+                self._settled.clear()
+            if not self._probing:
+                self._probing = probe = True
+                break
+            # Someone else is probing: wait for its verdict
+            await self._settled.wait()
+        self.requests += 1
+        return probe
+
+    def _abandon_probe(self):
+        # Let the next waiter probe instead
+        self._probing = False
+        self._settled.set()
+        self._settled.clear()
+
+    def _record(self, ok: bool, probe: bool):
+        if probe:
+            self._probing = False
+            if ok:
+                self.state = CLOSED
+                self._outcomes.clear()
+            else:
+                self._open()
+            self._settled.set()
+            return
+        if self.state != CLOSED:
+            # Attempts that went out before the breaker opened do not count
+            return
+        self._outcomes.append(ok)
+        if len(self._outcomes) >= self.min_requests:
+            failures = self._outcomes.count(False)
+            if failures > self.error_rate * len(self._outcomes):
+                self._open()
+
+    def _open(self):
+        self.state = OPEN
+        self.opened += 1
+        self.open_until = time.monotonic() + self.cooldown
+        self._outcomes.clear()
+        print(f"Circuit breaker open: pausing requests for {self.cooldown:g}s")
+
+    def snapshot(self) -> dict:
+        failures = self._outcomes.count(False)
+        return {
+            "state": self.state,
+            "requests": self.requests,
+            "retries": self.retries,
+            "retries_denied": self.denied,
+            "retries_left": max(0, int(self.min_retries + self.budget * self.requests) - self.retries),
+            "recent_error_rate": round(failures / len(self._outcomes), 3) if self._outcomes else 0.0,
+            "times_opened": self.opened,
+            "open_for": max(0.0, self.open_until - time.monotonic()) if self.state == OPEN else 0.0,
+        }
@@ -0,0 +1,65 @@
+import os
+import tempfile
+import unittest
+
+from modules.songs.journal import CrawlJournal
+from modules.songs.models import Song
+
+
+def song(name: str) -> Song:
+    return Song(song=name, singer="S", lyrics="l", chord_image="", views=1, song_transcriber="", chord_url="")
+
+
+class CrawlJournalTest(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), "crawl.journal")
+
+    def open(self) -> CrawlJournal:
+        return CrawlJournal.open(self.path, "full", 3, max_age=3600)
+
+    def test_resume_after_torn_tail_keeps_later_entries(self):
+        journal = self.open()
+        journal.page_done(1, [(0, ("/a", "A", "S")), (1, ("/b", "B", "S"))])
+        journal.song_done((1, 0), "/a", song("A"))
+        journal.close()
+        # Crash in the middle of writing the next entry
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write('{"page":1,"position":1,"so')
+
+        journal = self.open()
+        self.assertEqual(set(journal.songs), {(1, 0)})
+        journal.song_done((1, 1), "/b", song("B"))
+        journal.page_done(2, [(0, ("/c", "C", "S"))])
+        journal.close()
+
+        journal = self.open()
+        self.assertEqual(set(journal.songs), {(1, 0), (1, 1)})
+        self.assertEqual(journal.songs[(1, 1)], ("/b", song("B")))
+        self.assertEqual(set(journal.pages), {1, 2})
+        journal.close()
+
+    def test_unparseable_line_is_skipped(self):
+        journal = self.open()
+        journal.song_done((1, 0), "/a", song("A"))
+        journal.close()
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("garbage\n")
+        journal = self.open()
+        journal.song_done((1, 1), "/b", song("B"))
+        journal.close()
+
+        self.assertEqual(set(self.open().songs), {(1, 0), (1, 1)})
+
+    def test_gone_songs_and_resumes_are_kept(self):
+        journal = self.open()
+        journal.song_gone((1, 2), "/gone")
+        journal.close()
+        journal = self.open()
+        self.assertEqual(journal.gone, {(1, 2)})
+        self.assertEqual(journal.resumes, 1)
+        journal.close()
+        self.assertEqual(self.open().resumes, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,33 @@
+import unittest
+from datetime import datetime
+
+from core.config import Config
+from modules.songs.scheduler import CrawlScheduler
+
+
+class QuietHoursTest(unittest.TestCase):
+    def setUp(self):
+        self.saved = Config.CRAWL_QUIET_HOURS
+
+    def tearDown(self):
+        Config.CRAWL_QUIET_HOURS = self.saved
+
+    def remaining(self, hours, hour: int, minute: int = 0) -> float:
+        Config.CRAWL_QUIET_HOURS = hours
+        return CrawlScheduler.quiet_remaining(datetime(2026, 10, 17, hour, minute)) / 3600
+
+    def test_window_ending_at_midnight(self):
+        self.assertEqual(self.remaining((22, 24), 23), 1.0)
+        self.assertEqual(self.remaining((22, 24), 21), 0.0)
+
+    def test_window_wrapping_past_midnight(self):
+        self.assertEqual(self.remaining((23, 6), 23, 30), 6.5)
+        self.assertEqual(self.remaining((23, 6), 1), 5.0)
+        self.assertEqual(self.remaining((23, 6), 12), 0.0)
+
+    def test_fractional_end(self):
+        self.assertEqual(self.remaining((18, 23.5), 23), 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
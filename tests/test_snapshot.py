@@ -0,0 +1,57 @@
+import os
+import tempfile
+import unittest
+from array import array
+
+from modules.songs.index import SongSearchIndex
+from modules.songs.snapshot import SongSnapshot, write_snapshot
+from modules.songs.store import SongStore
+
+SONGS = [
+    ("ใจเดียว", "Bodyslam", "ใจเดียว ที่มี ให้เธอ Love"),
+    ("Love Song", "Potato", "love love ความรัก"),
+    ("ความรัก", "Bodyslam", "รักเธอ ใจเดียว"),
+    ("", "", ""),
+]
+
+
+class SnapshotIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), "songs.snapshot")
+        self.store = SongStore.from_columns(
+            [f"/song/{i}" for i in range(len(SONGS))],
+            {
+                "song": [song for song, _, _ in SONGS],
+                "singer": [singer for _, singer, _ in SONGS],
+                "lyrics": [lyrics for _, _, lyrics in SONGS],
+            },
+            [5, 30, 10, 1]
+        )
+        self.index = SongSearchIndex(self.store, n=3)
+
+    def test_sections_round_trip(self):
+        write_snapshot(self.path, {"song": self.store.song}, {"views": self.store.views},
+                       sections={"names": ["b", "a"], "ids": array('I', [7, 8, 9])})
+        snapshot = SongSnapshot(self.path)
+        self.assertEqual(list(snapshot.sections["names"]), ["b", "a"])
+        self.assertEqual(list(snapshot.sections["ids"]), [7, 8, 9])
+        self.assertEqual(list(snapshot.column("song")), list(self.store.song))
+        snapshot.close()
+
+    def test_mapped_index_matches_built_index(self):
+        write_snapshot(self.path, {}, {"views": self.store.views}, sections=self.index.sections())
+        snapshot = SongSnapshot(self.path)
+        mapped = SongSearchIndex.from_sections(snapshot.column("views"), snapshot.sections, 3)
+        queries = [
+            {"lyric": "ใจเดียว"}, {"lyric": "lo"}, {"lyric": "love", "sort": "views"},
+            {"song": "love", "singer": "pot"}, {"singer": "body", "sort": "name"},
+            {"min_views": 6, "sort": "singer"}, {"lyric": "ไม่มี"}, {},
+        ]
+        for query in queries:
+            self.assertEqual(list(mapped.search(**query)), list(self.index.search(**query)), query)
+        mapped = None
+        snapshot.close()
+
+
+if __name__ == "__main__":
+    unittest.main()